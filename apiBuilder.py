@@ -0,0 +1,77 @@
+import maya.api.OpenMaya as om
+
+# Node types that live in the DAG and need to be created by MDagModifier
+DAG_TYPES = ("joint", "transform", "locator")
+
+
+# Queues node creation, renames, attribute values and connections into a single MDagModifier
+# and commits them with one doIt() in finish(). Builds the same network as builders.CmdsBuilder
+# without going through the MEL command layer for every node, value and connection.
+# Note that modifier changes are not recorded on the undo queue, so the UI runs api builds with undo off
+class ApiBuilder():
+    def __init__(self):
+        self.modifier = om.MDagModifier()
+        # Maps node names to MObjects so existing nodes are only looked up once
+        # and nodes created by this builder can be found by name before doIt()
+        self.nodes = {}
+        # Names of the named nodes created by this builder
+        self.createdNodes = []
+
+
+    # Returns the MObject for a node created by this builder or an existing node name
+    def getObject(self, node):
+        if isinstance(node, om.MObject):
+            return node
+        if node not in self.nodes:
+            selection = om.MSelectionList()
+            selection.add(node)
+            self.nodes[node] = selection.getDependNode(0)
+        return self.nodes[node]
+
+
+    def createNode(self, nodeType, name=None, parent=None):
+        if nodeType in DAG_TYPES:
+            parentObject = self.getObject(parent) if parent else om.MObject.kNullObj
+            node = self.modifier.createNode(nodeType, parentObject)
+        else:
+            # MDagModifier.createNode only accepts DAG nodes, the DG version is called directly
+            node = om.MDGModifier.createNode(self.modifier, nodeType)
+
+        if name:
+            self.modifier.renameNode(node, name)
+            self.nodes[name] = node
+            self.createdNodes.append(name)
+        return node
+
+
+    # Queues a transform with a locator shape directly under the parent with its translate and scale set
+    # The parent is expected to sit at the origin so the position is used as the local translate
+    # Returns the name like the cmds builder, the MObject stays cached in nodes
+    def createLocator(self, name, parent, position, scale):
+        locator = self.createNode("transform", name=name, parent=parent)
+        shape = self.modifier.createNode("locator", locator)
+        self.modifier.renameNode(shape, name + "Shape")
+
+        for axis, value in zip("XYZ", position):
+            self.modifier.newPlugValueDouble(self.getPlug(locator, "translate" + axis), value)
+            self.modifier.newPlugValueDouble(self.getPlug(locator, "scale" + axis), scale)
+        return name
+
+
+    # Finds a plug from an attribute name such as "worldMatrix" or "matrixIn[1]"
+    # Array attributes without an index use element 0 like connectAttr does
+    def getPlug(self, node, attribute):
+        name, _, index = attribute.partition("[")
+        plug = om.MFnDependencyNode(self.getObject(node)).findPlug(name, False)
+        if plug.isArray:
+            plug = plug.elementByLogicalIndex(int(index.rstrip("]")) if index else 0)
+        return plug
+
+
+    def connect(self, source, sourceAttr, destination, destinationAttr):
+        self.modifier.connect(self.getPlug(source, sourceAttr), self.getPlug(destination, destinationAttr))
+
+
+    # Commits every queued node and connection in one go
+    def finish(self):
+        self.modifier.doIt()
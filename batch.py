@@ -0,0 +1,133 @@
+# Headless batch rigging for mayapy
+#
+# Builds the locators and joints for every character in a JSON config file and saves each one
+# into its own scene. Apart from name and backend every key is a RigConfig parameter. Example config file:
+#     [{"name": "hero", "spineCount": 4, "fingerCount": 5},
+#      {"name": "goblin", "spineCount": 3, "fingerCount": 3, "scale": 0.6, "backend": "api"}]
+#
+# Example usage:
+#     mayapy batch.py characters.json --output scenes --processes 8
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Starts Maya standalone in the current process. Every worker process runs this once
+def initializeMaya():
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+
+# Builds a single character into a new scene and saves it to the output directory
+# Returns a result dictionary instead of raising so one bad config does not stop the batch
+def buildCharacter(character, outputDirectory):
+    import maya.cmds as cmds
+    import locators
+    import joints
+    import undo
+    from config import RigConfig
+
+    name = character["name"]
+    start = time.perf_counter()
+    try:
+        cmds.file(new=True, force=True)
+
+        # Nothing is undone in a batch so the undo queue is switched off for speed
+        config = RigConfig.fromDict(character)
+        with undo.undoChunk(name, enabled=False):
+            locators.createLocators(config, backend=character.get("backend", "cmds"))
+            joints.createJoints(config, backend=character.get("backend", "cmds"))
+
+        path = os.path.join(outputDirectory, name + ".ma")
+        cmds.file(rename=path)
+        cmds.file(save=True, type="mayaAscii", force=True)
+    except Exception as error:
+        return {"name": name, "error": str(error), "seconds": time.perf_counter() - start}
+
+    return {"name": name, "path": path, "seconds": time.perf_counter() - start}
+
+
+# Builds every character into one scene, each in its own namespace named after the character,
+# and saves that scene once. Returns a result dictionary per character like buildCharacter
+def buildCrowd(characters, path):
+    import maya.cmds as cmds
+    import locators
+    import joints
+    import undo
+    from config import RigConfig
+
+    initializeMaya()
+    cmds.file(new=True, force=True)
+    results = []
+    with undo.undoChunk("crowd", enabled=False):
+        for character in characters:
+            name = character["name"]
+            start = time.perf_counter()
+            try:
+                config = RigConfig.fromDict(character)
+                locators.createLocators(config, backend=character.get("backend", "cmds"), namespace=name + ":")
+                joints.createJoints(config, backend=character.get("backend", "cmds"), namespace=name + ":")
+            except Exception as error:
+                results.append({"name": name, "error": str(error), "seconds": time.perf_counter() - start})
+                continue
+            results.append({"name": name, "path": path, "seconds": time.perf_counter() - start})
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    cmds.file(rename=path)
+    cmds.file(save=True, type="mayaAscii", force=True)
+    return results
+
+
+# Builds every character, either in this process or spread over a pool of mayapy processes
+def buildCharacters(characters, outputDirectory, processes=1):
+    if not os.path.isdir(outputDirectory):
+        os.makedirs(outputDirectory)
+
+    if processes <= 1:
+        initializeMaya()
+        return [buildCharacter(character, outputDirectory) for character in characters]
+
+    # Spawned workers start from a clean interpreter, forking an initialized Maya is not safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=initializeMaya) as pool:
+        return list(pool.map(buildCharacter, characters, [outputDirectory] * len(characters)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build RiggingBuddy locators and joints without the UI")
+    parser.add_argument("config", help="JSON file with a list of character configs")
+    parser.add_argument("-o", "--output", default="scenes", help="directory the scenes are saved to")
+    parser.add_argument("-p", "--processes", type=int, default=1, help="number of mayapy processes to use")
+    parser.add_argument("--crowd", help="build every character into this one scene instead, each in its own namespace")
+    args = parser.parse_args(argv)
+
+    with open(args.config) as configFile:
+        characters = json.load(configFile)
+
+    start = time.perf_counter()
+    if args.crowd:
+        results = buildCrowd(characters, args.crowd)
+    else:
+        results = buildCharacters(characters, args.output, args.processes)
+
+    failed = 0
+    for result in results:
+        if "error" in result:
+            failed += 1
+            print("FAILED " + result["name"] + ": " + result["error"])
+        else:
+            print("Built " + result["name"] + " in " + str(round(result["seconds"], 3)) + "s -> " + result["path"])
+    print("Built " + str(len(results) - failed) + "/" + str(len(results)) + " characters in "
+          + str(round(time.perf_counter() - start, 3)) + "s")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+# Benchmark for the locator and joint builds
+#
+# Sweeps the spine and finger counts and measures createLocators, mirrorLocators and createJoints
+# for every combination: wall time, number of cmds calls, nodes created and peak Python memory.
+# Results are written as JSON so releases can be compared against each other.
+#
+# Runs on the offline scene by default, or inside Maya with --maya (command counts are offline only)
+# Example usage:
+#     python benchmark.py --spine 1 11 --finger 1 11 --output results.json
+#     python benchmark.py --spine 1 20 --finger 5 5 --compare results.json
+#
+# --networks compares the full joint network with the lean one (see joints.createChainJoints) on the
+# largest config of the ranges: node counts of both, and the playback frame rate when run in Maya
+#     python benchmark.py --maya --networks --spine 6 6 --finger 5 5 --frames 500
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+PHASES = ("createLocators", "mirrorLocators", "createJoints")
+
+# Joint networks compared by --networks, name -> lean argument of joints.createJoints
+NETWORKS = (("full", False), ("lean", True))
+
+# Node types evaluated when the rig moves
+NETWORK_TYPES = ("joint", "transform", "aimMatrix", "multMatrix")
+
+
+# Returns the maya.cmds module to benchmark with, starting Maya standalone if needed
+def getCmds(useMaya):
+    if not useMaya:
+        import offline
+        return offline.install()
+
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+    import maya.cmds as cmds
+    return cmds
+
+
+def commandCount(cmds):
+    # Only the offline scene counts commands
+    scene = getattr(cmds, "scene", None)
+    return scene.commandCount() if scene is not None else None
+
+
+# Runs every phase once on a new scene and calls measure around each of them
+def runPhases(cmds, rigConfig, backend, measure):
+    import locators
+    import joints
+
+    cmds.file(new=True, force=True)
+    phases = {"createLocators": lambda: locators.createLocators(rigConfig, backend=backend),
+              "mirrorLocators": locators.mirrorLocators,
+              "createJoints": lambda: joints.createJoints(rigConfig, backend=backend)}
+    return {phase: measure(phases[phase]) for phase in PHASES}
+
+
+# Measures every phase for a single config
+# Times are the best of the repeats, memory is measured in a separate run since tracing slows the build down
+def benchmarkConfig(cmds, rigConfig, backend="cmds", repeats=3):
+    def timed(function):
+        nodes = len(cmds.ls())
+        commands = commandCount(cmds)
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        return {"seconds": seconds,
+                "commands": None if commands is None else commandCount(cmds) - commands,
+                "nodes": len(cmds.ls()) - nodes}
+
+    def traced(function):
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    runs = [runPhases(cmds, rigConfig, backend, timed) for i in range(repeats)]
+    memory = runPhases(cmds, rigConfig, backend, traced)
+
+    results = {}
+    for phase in PHASES:
+        best = min((run[phase] for run in runs), key=lambda result: result["seconds"])
+        results[phase] = dict(best, peakMemory=memory[phase])
+    return results
+
+
+# Benchmarks every spine/finger combination of the given inclusive ranges
+def benchmark(spineRange=(1, 11), fingerRange=(1, 11), backend="cmds", repeats=3, useMaya=False):
+    from config import RigConfig
+
+    cmds = getCmds(useMaya)
+    results = []
+    for spineCount in range(spineRange[0], spineRange[1] + 1):
+        for fingerCount in range(fingerRange[0], fingerRange[1] + 1):
+            rigConfig = RigConfig(spineCount=spineCount, fingerCount=fingerCount)
+            results.append({"spineCount": spineCount, "fingerCount": fingerCount,
+                            "phases": benchmarkConfig(cmds, rigConfig, backend, repeats)})
+
+    return {"environment": {"python": platform.python_version(),
+                            "maya": cmds.about(version=True) if useMaya else None,
+                            "offline": not useMaya,
+                            "backend": backend,
+                            "repeats": repeats},
+            "results": results}
+
+
+# Builds the rig with each joint network and counts its nodes, in Maya the frame rate of
+# playing back an animation of the root locator is measured too
+def benchmarkNetworks(cmds, rigConfig, frames=200, useMaya=False):
+    import locators
+    import joints
+
+    results = {}
+    for network, lean in NETWORKS:
+        cmds.file(new=True, force=True)
+        locators.createLocators(rigConfig)
+        joints.createJoints(rigConfig, lean=lean)
+        results[network] = {"nodes": {nodeType: len(cmds.ls(type=nodeType)) for nodeType in NETWORK_TYPES},
+                            "fps": playbackRate(cmds, frames) if useMaya else None}
+    return results
+
+
+# Frames per second of playing back the whole rig as fast as Maya can, every frame is evaluated
+# The root locator of the rig is animated so every node of the rig changes on every frame
+def playbackRate(cmds, frames, namespace=""):
+    cmds.setKeyframe(namespace + "LOC_root", attribute="translateY", time=1, value=2.5)
+    cmds.setKeyframe(namespace + "LOC_root", attribute="translateY", time=frames, value=3.5)
+    cmds.playbackOptions(minTime=1, maxTime=frames, loop="once", maxPlaybackSpeed=0, playbackSpeed=0)
+    cmds.currentTime(1)
+    start = time.perf_counter()
+    cmds.play(wait=True)
+    return frames / (time.perf_counter() - start)
+
+
+def printNetworks(results):
+    for network, result in results.items():
+        print(network.ljust(6) + ", ".join(nodeType + ": " + str(count) for nodeType, count in result["nodes"].items()) +
+              ("" if result["fps"] is None else ", " + str(round(result["fps"], 1)) + " fps"))
+
+
+# Prints the time of each phase relative to an older benchmark for the configs both runs have
+def compareResults(old, new):
+    oldResults = {(r["spineCount"], r["fingerCount"]): r["phases"] for r in old["results"]}
+    totals = {phase: [0.0, 0.0] for phase in PHASES}
+    for result in new["results"]:
+        key = (result["spineCount"], result["fingerCount"])
+        if key not in oldResults:
+            continue
+        for phase in PHASES:
+            totals[phase][0] += oldResults[key][phase]["seconds"]
+            totals[phase][1] += result["phases"][phase]["seconds"]
+
+    for phase, (oldSeconds, newSeconds) in totals.items():
+        if newSeconds:
+            print(phase + ": " + str(round(oldSeconds / newSeconds, 2)) + "x faster than before")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the RiggingBuddy locator and joint builds")
+    parser.add_argument("--spine", type=int, nargs=2, default=(1, 11), metavar=("MIN", "MAX"))
+    parser.add_argument("--finger", type=int, nargs=2, default=(1, 11), metavar=("MIN", "MAX"))
+    parser.add_argument("--backend", default="cmds", help="build backend, cmds or api")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--maya", action="store_true", help="run in Maya standalone instead of offline")
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--networks", action="store_true", help="compare the full and the lean joint network")
+    parser.add_argument("--frames", type=int, default=200, help="frames played back by --networks in Maya")
+    args = parser.parse_args(argv)
+
+    if args.networks:
+        from config import RigConfig
+        rigConfig = RigConfig(spineCount=args.spine[1], fingerCount=args.finger[1])
+        printNetworks(benchmarkNetworks(getCmds(args.maya), rigConfig, args.frames, args.maya))
+        return
+
+    results = benchmark(args.spine, args.finger, args.backend, args.repeats, args.maya)
+
+    if args.output:
+        with open(args.output, "w") as outputFile:
+            json.dump(results, outputFile, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print("")
+
+    if args.compare:
+        with open(args.compare) as compareFile:
+            compareResults(json.load(compareFile), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import maya.cmds as cmds
+
+# Builders create the nodes of the rig for locators.py and joints.py
+# Every builder has the same methods so the builds do not care which backend is used:
+#     createNode(nodeType, name, parent)              -> node
+#     createLocator(name, parent, position, scale)    -> node
+#     connect(source, sourceAttr, destination, destinationAttr)
+#     finish()                                        commits anything that was queued
+#     createdNodes                                    names of the nodes made, see ownership.py
+# RecordingBuilder has the same methods and only records the calls
+
+
+# Returns the builder for the given backend
+# "cmds" issues one maya.cmds call at a time, "api" queues everything into a single OpenMaya modifier
+def getBuilder(backend):
+    if backend == "cmds":
+        return CmdsBuilder()
+    if backend == "api":
+        # Only imported when used so the cmds backend does not need OpenMaya
+        import apiBuilder
+        return apiBuilder.ApiBuilder()
+    raise ValueError("Unknown build backend: " + str(backend))
+
+
+# Creates nodes and connections one maya.cmds call at a time
+class CmdsBuilder():
+    def __init__(self):
+        self.createdNodes = []
+
+
+    def createNode(self, nodeType, name=None, parent=None):
+        if parent:
+            node = cmds.createNode(nodeType, name=name, parent=parent)
+        elif name:
+            node = cmds.createNode(nodeType, name=name)
+        else:
+            node = cmds.createNode(nodeType)
+        self.createdNodes.append(node)
+        return node
+
+
+    # Creates the locator directly under its parent and sets its translate and scale in one xform call,
+    # which skips the reparenting and world space move of spaceLocator + scale + move + parent
+    # The parent is expected to sit at the origin so the position is used as the local translate
+    def createLocator(self, name, parent, position, scale):
+        locator = cmds.createNode("transform", name=name, parent=parent)
+        cmds.createNode("locator", name=locator + "Shape", parent=locator)
+        cmds.xform(locator, translation=tuple(position), scale=(scale, scale, scale))
+        self.createdNodes.append(locator)
+        return locator
+
+
+    def connect(self, source, sourceAttr, destination, destinationAttr):
+        cmds.connectAttr(source + "." + sourceAttr, destination + "." + destinationAttr, force=True)
+
+
+    def finish(self):
+        pass
+
+
+# Records the calls of a build instead of making any nodes, so they can be replayed on another builder
+# Replaying with a mapName function renames every node on the way, which is how recorded calls are
+# moved into a namespace
+class RecordingBuilder():
+    def __init__(self):
+        # (method name, arguments, indices of the arguments that are node names)
+        self.calls = []
+
+
+    def createNode(self, nodeType, name=None, parent=None):
+        self.calls.append(("createNode", (nodeType, name, parent), (1, 2)))
+        return name
+
+
+    def createLocator(self, name, parent, position, scale):
+        self.calls.append(("createLocator", (name, parent, position, scale), (0, 1)))
+        return name
+
+
+    def connect(self, source, sourceAttr, destination, destinationAttr):
+        self.calls.append(("connect", (source, sourceAttr, destination, destinationAttr), (0, 2)))
+
+
+    def finish(self):
+        pass
+
+
+    # Plain lists of the calls that can be saved as JSON and loaded with fromData
+    def toData(self):
+        return [[method, list(arguments), list(nameIndices)] for method, arguments, nameIndices in self.calls]
+
+
+    @classmethod
+    def fromData(cls, data):
+        recording = cls()
+        recording.calls = [(method, tuple(arguments), tuple(nameIndices)) for method, arguments, nameIndices in data]
+        return recording
+
+
+    def replay(self, builder, mapName=None):
+        for method, arguments, nameIndices in self.calls:
+            if mapName is not None:
+                arguments = [mapName(argument) if i in nameIndices and argument else argument
+                             for i, argument in enumerate(arguments)]
+            getattr(builder, method)(*arguments)
@@ -0,0 +1,46 @@
+# Build parameters for a rig
+#
+# A RigConfig is read once (from the UI fields, a batch config file or code) and passed
+# through the whole build, so the build itself never has to query any UI widgets.
+class RigConfig():
+    def __init__(self, spineCount=4, fingerCount=5, scale=1.0, proportions=None, counts=None):
+        self.spineCount = spineCount
+        self.fingerCount = fingerCount
+        # Uniform scale of every locator position and size
+        self.scale = scale
+        # Multiplier for the offsets of a chain by template name, example: {"arm": 1.2, "finger": 0.8}
+        self.proportions = dict(proportions or {})
+        # Counts used by custom template entries, example: {"tailCount": 6}
+        self.counts = dict(counts or {})
+
+
+    def __repr__(self):
+        return "RigConfig(" + ", ".join(key + "=" + repr(value) for key, value in self.toDict().items()) + ")"
+
+
+    def __eq__(self, other):
+        return isinstance(other, RigConfig) and self.toDict() == other.toDict()
+
+
+    # Returns the count used by a template entry, example: config.count("spineCount")
+    def count(self, name):
+        if name in self.counts:
+            return self.counts[name]
+        return getattr(self, name)
+
+
+    def proportion(self, chainName):
+        return self.proportions.get(chainName, 1.0)
+
+
+    def toDict(self):
+        return {"spineCount": self.spineCount, "fingerCount": self.fingerCount, "scale": self.scale,
+                "proportions": dict(self.proportions), "counts": dict(self.counts)}
+
+
+    # Creates a config from a dictionary such as a character entry of a batch file
+    # Keys that are not build parameters (name, backend...) are ignored
+    @classmethod
+    def fromDict(cls, data):
+        keys = ("spineCount", "fingerCount", "scale", "proportions", "counts")
+        return cls(**{key: data[key] for key in keys if key in data})
@@ -0,0 +1,139 @@
+# Builds that run in chunks on Maya idle events so the UI stays responsive during long builds
+#
+# A build is a list of stages, each a generator that makes one chain per step such as
+# locators.createLocatorSteps and joints.createJointSteps. Every chunk runs steps until CHUNK_SECONDS
+# have passed and then hands back to Maya with executeDeferred, which only runs the next chunk once
+# Maya is idle again, so clicks and redraws are handled between chunks.
+#
+# Cancelling closes the running stage, which deletes the nodes it made so far, and then undoes the
+# stages that were already done in reverse order, leaving the scene as it was before the build.
+#
+# Example:
+#     build = deferredBuild.buildRig(RigConfig(spineCount=8), onProgress=lambda done, total, name: ...)
+#     build.cancel()
+import time
+import maya.cmds as cmds
+import joints
+import locators
+import templates
+import undo
+
+# Longest time a chunk keeps Maya busy before it hands back to the UI, at least one step always runs
+CHUNK_SECONDS = 0.05
+
+
+class DeferredBuild():
+    # stages are (generator, undo function) pairs, total is the amount of steps of every stage together
+    # onProgress(done, total, name) is called after every chunk, onDone(cancelled) when the build ends
+    def __init__(self, stages, total, onProgress=None, onDone=None):
+        self.stages = list(stages)
+        self.total = total
+        self.onProgress = onProgress
+        self.onDone = onDone
+        self.done = 0
+        self.finishedStages = []
+        self.running = False
+
+
+    # Queues the first chunk, returns straight away
+    def start(self):
+        import maya.utils
+        self.running = True
+        maya.utils.executeDeferred(self.runChunk)
+
+
+    # Runs the whole build straight away, for mayapy and the offline scene where there are no idle events
+    def run(self):
+        self.running = True
+        while self.running:
+            self.runChunk(deferNext=False)
+
+
+    def runChunk(self, deferNext=True):
+        if not self.running:
+            return
+
+        start = time.perf_counter()
+        name = None
+        # Nothing a chunk makes is recorded for undo, cancel and the delete buttons take its place
+        with undo.undoChunk("deferredBuild", enabled=False):
+            while self.stages and (name is None or time.perf_counter() - start < CHUNK_SECONDS):
+                generator, undoStage = self.stages[0]
+                try:
+                    name = next(generator)
+                    self.done += 1
+                except StopIteration:
+                    self.finishedStages.append(self.stages.pop(0))
+                except Exception:
+                    # A stage that failed cannot clean up after itself, it is undone with the finished ones
+                    self.finishedStages.append(self.stages.pop(0))
+                    self.cancel()
+                    raise
+
+        if self.onProgress is not None and name is not None:
+            self.onProgress(self.done, self.total, name)
+
+        if not self.stages:
+            self.finish(False)
+        elif deferNext:
+            import maya.utils
+            maya.utils.executeDeferred(self.runChunk)
+
+
+    # Stops the build and removes everything it made
+    def cancel(self):
+        if not self.running:
+            return
+        with undo.undoChunk("deferredBuild", enabled=False):
+            if self.stages:
+                self.stages[0][0].close()
+            for generator, undoStage in reversed(self.finishedStages):
+                undoStage()
+        self.finish(True)
+
+
+    def finish(self, cancelled):
+        self.running = False
+        self.stages = []
+        if self.onDone is not None:
+            self.onDone(cancelled)
+
+
+# Deferred build of the locators and then the joints of a config, started straight away
+# makeLocators and makeJoints pick the stages, a stage whose group is already in the scene is skipped
+# so cancelling never deletes a part of the rig the build did not make
+# Without a config the joints are built for the locators in the scene
+# Builds with the api backend run straight away, only cmds builds are spread over idle events
+def buildRig(config=None, backend="cmds", namespace="", lean=False, makeLocators=True, makeJoints=True,
+             onProgress=None, onDone=None, start=True):
+    stages = []
+    if makeLocators:
+        if cmds.objExists(namespace + "opmStorage_GRP"):
+            print("The locator group already exists!")
+        else:
+            config = config or locators.readConfig()
+            stages.append((locators.createLocatorSteps(config, backend, namespace),
+                           lambda: locators.deleteLocators(namespace)))
+    if makeJoints:
+        if cmds.objExists(namespace + "JNT_GRP"):
+            print("The joint group already exists!")
+        elif stages:
+            # The joints are checked against the locators once the first stage has made them
+            stages.append((joints.createJointSteps(config, backend, namespace=namespace, lean=lean),
+                           lambda: joints.deleteJoints(namespace)))
+        else:
+            # Joints for the locators in the scene are checked up front so a build that cannot work never starts
+            jointPlan, config = joints.checkedPlan(config, namespace, lean)
+            if jointPlan is not None:
+                stages.append((joints.createJointSteps(config, backend, namespace=namespace, lean=lean),
+                               lambda: joints.deleteJoints(namespace)))
+
+    chainCount = len(templates.expandSkeleton(config, namespace=namespace)) if stages else 0
+
+    build = DeferredBuild(stages, chainCount * len(stages), onProgress, onDone)
+    if start and backend == "api":
+        # The api backend makes every node with one doIt in the last step, chunks would not spread the work
+        build.run()
+    elif start:
+        build.start()
+    return build
@@ -0,0 +1,192 @@
+# Scene footprint and leak diagnostics for RiggingBuddy rigs
+#
+# Reports the nodes RiggingBuddy owns (the nodes in its containers, see ownership.py), the rig
+# nodes that are not tracked (built before the nodes were tracked) and the orphans: RiggingBuddy matrix
+# nodes whose output goes nowhere and _REST nodes whose joint is gone. Those are what repeated
+# build/delete cycles used to leave behind, cleanup() deletes them in one call.
+#
+# leakCheck() runs build/update/delete cycles and checks the scene goes back to its node count,
+# offline by default so it can run on any machine:
+#     python diagnostics.py --cycles 20
+#
+# Example in Maya:
+#     diagnostics.printReport(diagnostics.sceneReport())
+#     diagnostics.cleanup()
+import argparse
+import os
+import sys
+import tempfile
+
+# main() can run without Maya, the module is imported again after the offline cmds is installed
+try:
+    import maya.cmds as cmds
+except ImportError:
+    cmds = None
+
+# Node types of the matrix network that are dead weight once nothing reads their output
+UTILITY_TYPES = ("aimMatrix", "multMatrix", "pickMatrix")
+
+# Names of the matrix nodes RiggingBuddy makes, without the namespace or prefix of the rig
+UTILITY_PATTERNS = ("JNT_*_AIM", "JNT_*_MULT", "LOC_R_*_MIRROR", "LOC_R_*_PICK")
+
+# Suffixes of the container names made by ownership.py
+CONTAINER_SUFFIXES = ("opmStorage_CONT", "JNT_CONT")
+
+
+# Every node in the RiggingBuddy containers of every namespace
+def ownedNodes():
+    owned = set()
+    for container in cmds.ls(type="container") or []:
+        if container.endswith(CONTAINER_SUFFIXES):
+            owned.add(container)
+            owned.update(cmds.container(container, query=True, nodeList=True) or [])
+    return owned
+
+
+# Nodes that are left over from rigs that are gone
+# Owned nodes are never orphans, they go with their rig. Matrix nodes of other tools are never touched,
+# only the ones named like RiggingBuddy names them and the unnamed ones of rigs built before the nodes
+# were named, which read from LOC_ locators or JNT_*_REST nodes
+def findOrphans(owned=None):
+    if owned is None:
+        owned = ownedNodes()
+
+    patterns = []
+    for pattern in UTILITY_PATTERNS:
+        patterns.extend(["*" + pattern, "*:" + pattern])
+    named = set(cmds.ls(patterns, type=UTILITY_TYPES) or [])
+
+    orphans = []
+    for node in cmds.ls(type=UTILITY_TYPES) or []:
+        if node in owned or cmds.listConnections(node, source=False, destination=True):
+            continue
+        sources = cmds.listConnections(node, source=True, destination=False) or []
+        if node in named or any(isRigInput(source) for source in sources):
+            orphans.append(node)
+
+    for node in cmds.ls("*JNT_*_REST", "*:JNT_*_REST", type="transform") or []:
+        if node not in owned and not cmds.objExists(node[:-len("_REST")]):
+            orphans.append(node)
+    return orphans
+
+
+# True for the nodes the unnamed matrix nodes of old rigs read from: locators and _REST nodes
+def isRigInput(node):
+    name = node.rpartition(":")[2]
+    return name.startswith("LOC_") or (name.startswith("JNT_") and name.endswith("_REST"))
+
+
+# Node counts by type of the owned, untracked and orphaned RiggingBuddy nodes
+# fileBytes is roughly what the orphans add to a saved .ma file, None when it cannot be measured
+def sceneReport(measureFileSize=True):
+    owned = ownedNodes()
+    orphans = findOrphans(owned)
+
+    # Shapes go with their transform so only transforms and joints are counted
+    untracked = set()
+    for node in cmds.ls("*LOC_*", "*JNT_*", "*opmStorage_GRP", type=["transform", "joint"]) or []:
+        if node not in owned:
+            untracked.add(node)
+    untracked.difference_update(orphans)
+
+    return {"owned": countTypes(owned),
+            "untracked": countTypes(untracked),
+            "orphaned": countTypes(orphans),
+            "orphans": sorted(orphans),
+            "sceneNodes": len(cmds.ls()),
+            "fileBytes": exportSize(orphans) if measureFileSize and orphans else 0}
+
+
+def countTypes(nodes):
+    counts = {}
+    for node in nodes:
+        nodeType = cmds.nodeType(node)
+        counts[nodeType] = counts.get(nodeType, 0) + 1
+    return counts
+
+
+# Size of the nodes when exported on their own as a Maya ASCII file
+# Returns None when exporting is not possible, for example on the offline scene
+def exportSize(nodes):
+    handle, path = tempfile.mkstemp(suffix=".ma")
+    os.close(handle)
+    try:
+        selection = cmds.ls(selection=True)
+        cmds.select(nodes, replace=True, noExpand=True)
+        cmds.file(path, exportSelected=True, type="mayaAscii", force=True, constructionHistory=False)
+        if selection:
+            cmds.select(selection, replace=True)
+        else:
+            cmds.select(clear=True)
+        return os.path.getsize(path) or None
+    except (AttributeError, RuntimeError, TypeError):
+        return None
+    finally:
+        os.remove(path)
+
+
+def printReport(report):
+    for key in ("owned", "untracked", "orphaned"):
+        counts = report[key]
+        print(key.ljust(10) + str(sum(counts.values())).rjust(6) + "  " +
+              ", ".join(nodeType + ": " + str(counts[nodeType]) for nodeType in sorted(counts)))
+    print("Scene nodes: " + str(report["sceneNodes"]))
+    if report["fileBytes"] is not None:
+        print("Orphans in a saved file: " + str(report["fileBytes"]) + " bytes")
+
+
+# Deletes every orphan in one call and returns how many were deleted
+def cleanup():
+    orphans = findOrphans()
+    if orphans:
+        cmds.delete(orphans)
+    return len(orphans)
+
+
+# Runs build, live mirror, update and delete cycles and checks the node count of the scene comes back
+# to where it started after every cycle. Returns (passed, node count after each cycle, baseline)
+def leakCheck(cycles=10, config=None, backend="cmds", namespace=""):
+    import locators
+    import joints
+    from config import RigConfig
+
+    config = config or RigConfig()
+    grown = RigConfig(spineCount=config.spineCount + 1, fingerCount=config.fingerCount + 1, scale=config.scale)
+    baseline = len(cmds.ls())
+    counts = []
+    for cycle in range(cycles):
+        locators.createLocators(config, backend=backend, namespace=namespace)
+        joints.createJoints(config, backend=backend, namespace=namespace)
+        locators.createLiveMirror(namespace)
+        locators.updateLocators(grown, backend=backend, namespace=namespace)
+        joints.updateJoints(grown, backend=backend, namespace=namespace)
+        joints.deleteJoints(namespace)
+        locators.deleteLocators(namespace)
+        counts.append(len(cmds.ls()))
+    return all(count == baseline for count in counts), counts, baseline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that RiggingBuddy build/delete cycles do not leak nodes")
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--backend", default="cmds", help="build backend, cmds or api")
+    parser.add_argument("--maya", action="store_true", help="run in Maya standalone instead of offline")
+    args = parser.parse_args(argv)
+
+    if args.maya:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+    else:
+        import offline
+        offline.install()
+    # The check runs on the imported module, which is the one that has the offline cmds
+    import diagnostics
+
+    passed, counts, baseline = diagnostics.leakCheck(args.cycles, backend=args.backend)
+    print("Baseline: " + str(baseline) + " nodes, after each cycle: " + str(counts))
+    print("No leaks" if passed else "LEAK: the scene grows with every build/delete cycle")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
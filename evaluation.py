@@ -0,0 +1,246 @@
+# Evaluation graph checks for the node network of a rig
+#
+# Reads the nodes a rig owns (see ownership.py) back from the scene with their parents and connections,
+# and checks the network is something Maya can evaluate quickly:
+#     cycles       - loops through the matrix connections or the hierarchy, Maya evaluates those serially
+#     levels       - nodes grouped by the longest chain of nodes they wait for. Every node of a level can
+#                    be evaluated at the same time, so the amount of levels is the critical path and the
+#                    nodes per level is the work the parallel evaluation manager can spread over its threads
+#     partitions   - groups of nodes with no connection between them, which never wait for each other
+#     cost         - nodes evaluated again when a node changes, the nodes at the top are the expensive ones
+# In Maya the cycle clusters of the evaluation manager and the time measured by dgtimer per node are
+# reported too, and profilePlayback compares the playback frame rate under DG and parallel evaluation.
+#
+# Example:
+#     python evaluation.py --spine 6 --finger 5
+#     mayapy evaluation.py --maya --frames 500
+import argparse
+import sys
+import plan
+
+# main() can run without Maya, the module is imported again after the offline cmds is installed
+try:
+    import maya.cmds as cmds
+except ImportError:
+    cmds = None
+
+# Evaluation manager modes compared by profilePlayback, "off" is the DG evaluation
+PLAYBACK_MODES = ("off", "parallel")
+
+
+# The owned nodes of a rig with their parents and connections as a plan.BuildPlan
+# Only connections between nodes of the rig are kept
+def rigGraph(namespace=""):
+    import ownership
+
+    names = []
+    for container in (ownership.LOCATOR_CONTAINER, ownership.JOINT_CONTAINER):
+        names.extend(ownership.ownedNodes(namespace + container))
+    owned = set(names)
+
+    nodes = []
+    connections = []
+    for name in names:
+        parent = cmds.listRelatives(name, parent=True)
+        nodes.append((cmds.nodeType(name), name, parent[0] if parent else None))
+        found = cmds.listConnections(name, source=False, destination=True, plugs=True, connections=True) or []
+        for sourcePlug, destinationPlug in zip(found[::2], found[1::2]):
+            if destinationPlug.split(".")[0] in owned:
+                connections.append(tuple(sourcePlug.split(".", 1)) + tuple(destinationPlug.split(".", 1)))
+    return plan.BuildPlan(nodes, connections)
+
+
+# Cycles, levels, partitions and the cost of every node of a graph
+def analyzeGraph(graph):
+    outputs = {name: set() for name in graph.names()}
+    for source, sourceAttr, destination, destinationAttr in graph.connections:
+        outputs.setdefault(source, set()).add(destination)
+    for name, parent in graph.parents():
+        outputs.setdefault(parent, set()).add(name)
+
+    # Nodes are levelled in topological order, nodes in a cycle never get a level
+    waiting = dict((name, 0) for name in outputs)
+    for name in outputs:
+        for output in outputs[name]:
+            waiting[output] += 1
+    levels = dict((name, 0) for name in outputs if not waiting[name])
+    order = list(levels)
+    for name in order:
+        for output in outputs[name]:
+            levels[output] = max(levels.get(output, 0), levels[name] + 1)
+            waiting[output] -= 1
+            if not waiting[output]:
+                order.append(output)
+
+    levelSizes = [0] * (max(levels.values()) + 1 if levels else 0)
+    for level in levels.values():
+        levelSizes[level] += 1
+
+    # Everything downstream of a node, worked out from the last level back
+    downstream = {}
+    for name in reversed(order):
+        found = set(outputs[name])
+        for output in outputs[name]:
+            found.update(downstream.get(output, ()))
+        downstream[name] = found
+    cost = sorted(((len(downstream[name]), name) for name in downstream), reverse=True)
+
+    return {"nodes": len(outputs),
+            "connections": len(graph.connections),
+            "cycles": graph.cycles(),
+            "levels": levelSizes,
+            "criticalPath": len(levelSizes),
+            "parallelism": float(len(order)) / len(levelSizes) if levelSizes else 0.0,
+            "partitions": partitions(outputs),
+            "cost": [(name, count) for count, name in cost]}
+
+
+# Groups of nodes that are connected to each other in either direction, largest first
+def partitions(outputs):
+    neighbours = dict((name, set(connected)) for name, connected in outputs.items())
+    for name, connected in outputs.items():
+        for output in connected:
+            neighbours[output].add(name)
+
+    groups = []
+    seen = set()
+    for start in outputs:
+        if start in seen:
+            continue
+        group = [start]
+        seen.add(start)
+        for name in group:
+            for neighbour in neighbours[name] - seen:
+                seen.add(neighbour)
+                group.append(neighbour)
+        groups.append(sorted(group))
+    return sorted(groups, key=len, reverse=True)
+
+
+# Adds the cycle clusters of the evaluation manager and the dgtimer time of the most expensive nodes
+# to a report, playing back frames to time the nodes. Only works in Maya
+def measureEvaluation(report, frames=100, namespace="", maxNodes=20):
+    import undo
+
+    with undo.undoChunk("measureEvaluation", enabled=False):
+        cmds.dgtimer(on=True, reset=True)
+        try:
+            playback(frames, namespace)
+        finally:
+            cmds.dgtimer(off=True)
+    report["milliseconds"] = [(name, cmds.dgtimer(query=True, name=name, returnType="self"))
+                              for name, count in report["cost"][:maxNodes]]
+
+    # The evaluation graph only exists once the scene has been evaluated, which the playback did
+    clusters = []
+    for name, count in report["cost"]:
+        cluster = cmds.evaluationManager(cycleCluster=name, query=True) or []
+        if len(cluster) > 1 and sorted(cluster) not in clusters:
+            clusters.append(sorted(cluster))
+    report["cycleClusters"] = clusters
+    return report
+
+
+# Plays back frames with the root locator animated and returns the frame rate
+# The locator position, the time range and the current time are put back after. Keys or any other input
+# the locator height already had are disconnected while the profiling animation plays and connected
+# again after, so they come back untouched. Nothing is recorded on the undo queue
+def playback(frames, namespace=""):
+    import benchmark
+    import undo
+
+    root = namespace + "LOC_root"
+    height = cmds.getAttr(root + ".translateY")
+    currentTime = cmds.currentTime(query=True)
+    minTime = cmds.playbackOptions(query=True, minTime=True)
+    maxTime = cmds.playbackOptions(query=True, maxTime=True)
+    loop = cmds.playbackOptions(query=True, loop=True)
+    speed = cmds.playbackOptions(query=True, playbackSpeed=True)
+    maxSpeed = cmds.playbackOptions(query=True, maxPlaybackSpeed=True)
+    with undo.undoChunk("playback", enabled=False):
+        inputs = cmds.listConnections(root + ".translateY", source=True, destination=False, plugs=True) or []
+        for source in inputs:
+            cmds.disconnectAttr(source, root + ".translateY")
+        try:
+            return benchmark.playbackRate(cmds, frames, namespace)
+        finally:
+            # Only the curve of the profiling keys is on the attribute now
+            cmds.cutKey(root, attribute="translateY")
+            cmds.setAttr(root + ".translateY", height)
+            for source in inputs:
+                cmds.connectAttr(source, root + ".translateY", force=True)
+            cmds.playbackOptions(minTime=minTime, maxTime=maxTime, loop=loop, playbackSpeed=speed,
+                                 maxPlaybackSpeed=maxSpeed)
+            cmds.currentTime(currentTime)
+
+
+# Frames per second of the rig under each evaluation manager mode, the mode of the scene is restored after
+def profilePlayback(frames=200, namespace="", modes=PLAYBACK_MODES):
+    import undo
+
+    previousMode = cmds.evaluationManager(query=True, mode=True)[0]
+    rates = {}
+    with undo.undoChunk("profilePlayback", enabled=False):
+        try:
+            for mode in modes:
+                cmds.evaluationManager(mode=mode)
+                rates[mode] = playback(frames, namespace)
+        finally:
+            cmds.evaluationManager(mode=previousMode)
+    return rates
+
+
+def printReport(report, maxNodes=10):
+    print("Nodes: " + str(report["nodes"]) + ", connections: " + str(report["connections"]))
+    print("Cycles: " + str(len(report["cycles"])))
+    for cycle in report["cycles"]:
+        print("    " + " -> ".join(cycle))
+    print("Critical path: " + str(report["criticalPath"]) + " nodes, widest level: " +
+          str(max(report["levels"] or [0])) + " nodes, average parallelism: " + str(round(report["parallelism"], 1)))
+    print("Partitions: " + str(len(report["partitions"])) + ", largest: " + str(len(report["partitions"][0]) if report["partitions"] else 0))
+    for cluster in report.get("cycleClusters", []):
+        print("Cycle cluster: " + ", ".join(cluster))
+    print("Nodes evaluated again when a node changes:")
+    for name, count in report["cost"][:maxNodes]:
+        print("    " + name.ljust(32) + str(count).rjust(6))
+    for name, milliseconds in report.get("milliseconds", []):
+        print("    " + name.ljust(32) + str(round(milliseconds, 3)).rjust(10) + " ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the evaluation graph of a RiggingBuddy rig")
+    parser.add_argument("--spine", type=int, default=4)
+    parser.add_argument("--finger", type=int, default=5)
+    parser.add_argument("--lean", action="store_true", help="check the lean joint network")
+    parser.add_argument("--maya", action="store_true", help="run in Maya standalone and profile the playback")
+    parser.add_argument("--frames", type=int, default=200, help="frames played back in Maya")
+    args = parser.parse_args(argv)
+
+    if args.maya:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+    else:
+        import offline
+        offline.install()
+    # The checks run on the imported modules, which are the ones that have the offline cmds
+    import evaluation
+    import locators
+    import joints
+    from config import RigConfig
+
+    rigConfig = RigConfig(spineCount=args.spine, fingerCount=args.finger)
+    locators.createLocators(rigConfig)
+    joints.createJoints(rigConfig, lean=args.lean)
+
+    report = evaluation.analyzeGraph(evaluation.rigGraph())
+    if args.maya:
+        evaluation.measureEvaluation(report, args.frames)
+    evaluation.printReport(report)
+    if args.maya:
+        for mode, rate in evaluation.profilePlayback(args.frames).items():
+            print(("DG" if mode == "off" else mode).ljust(10) + str(round(rate, 1)).rjust(8) + " fps")
+    return 1 if report["cycles"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
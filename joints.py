@@ -1,761 +1,323 @@
-import maya.cmds as cmds
-from importlib import reload
-import locators
-
-locators = reload(locators)
-
-
-# Function to create all joints for the rig
-def createJoints():
-    if cmds.objExists("JNT_GRP"):
-        print("The joint group already exists!")
-        return 0
-    else:
-        # Creates empty joint group
-        jointGroup = cmds.group(empty=True, name="JNT_GRP")
-        
-    # Finds the location of all the finger locators
-    allFingers = cmds.ls("LOC_L_finger_*_0")
-    
-    # Creates spine by finding LOC_root and using that to find all other spine locators
-    root = cmds.ls("LOC_root")
-    allSpines = cmds.ls("LOC_spine_*", type="locator")
-    spine = cmds.listRelatives(*allSpines, parent=True, fullPath=True)
-    
-    # Creates all spine joints including root
-    for i, s in enumerate(spine):
-        # This is a special case since the root joint has no parent and must be handled seperately
-        if i == 0:
-            # Creates a joint name variable to make the creation process easier to iterate
-            # The joint names are determined based upon the allSpines and spine variables above
-            jointAName = "JNT_root"
-            jointBName = "JNT_spine_" + str(i)
-            
-            # Creates the joints using a similar setup to the names for ease of iteration
-            jointA = cmds.createNode("joint", name=jointAName)
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            # Finds the appropiate locator and stores it as a variable
-            locatorA = "LOC_root"
-            locatorB = "LOC_spine_" + str(i)
-            
-            # Creates the transform node that will be used to store the rest position and rotation
-            rotationA = cmds.createNode("transform", name=jointAName + "_REST", parent="opmStorage_GRP")
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            # These nodes do all the necessary math for the OPM setup to work properly
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            # This is where the magic happens! Through these connections in the node editor,
-            # the joint is able to stay zeroed out and oriented properly while passing off
-            # all of the transformation values to the rest group made above
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationA + ".worldInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationA + ".offsetParentMatrix", force=True)
-            # This line is ONLY needed for the root joint of the skeleton
-            cmds.connectAttr(rotationA + ".worldMatrix", jointA + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        # All other spine joints can be created without any special situation to account for
-        else:
-            # I use B and C instead of A and B to avoid confusion with the above if statement
-            # Joint B is the same joint used above, but now it is the parent instead of the child.
-            # For all iterations Joint B will always be the parent of Joint C
-            jointBName = "JNT_spine_" + str(i - 1)
-            jointCName = "JNT_spine_" + str(i)
-            
-            # Joint B alredy exists so the variable is updated by always storing the joint that is at i - 1
-            jointB = "JNT_spine_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            # The locators are always at position i and i - 1
-            locatorB = "LOC_spine_" + str(i - 1)
-            locatorC = "LOC_spine_" + str(i)
-            
-            # Rest B already exists so the variable is updated by always storing the joint that is at i - 1
-            rotationB = "JNT_spine_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            # You always need a new version of each of these nodes each iteration
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            # This is where the magic happens! Through these connections in the node editor,
-            # the joint is able to stay zeroed out and oriented properly while passing off
-            # all of the transformation values to the rest group made above
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)
-            
-        '''   
-            # This is a special case since the root joint has no parent and must be handled seperately
-        if i == 0:
-            # Creates a joint name variable to make the creation process easier to iterate
-            # The joint names are determined based upon the allSpines and spine variables above
-            controlAName = "CTL_root"
-            controlBName = "CTL_spine_" + str(i)
-            
-            # Creates the joints using a similar setup to the names for ease of iteration
-            controlA = cmds.circle(name=controlAName)
-            controlB = cmds.circle(name=controlBName)
-            cmds.parent(controlB, controlA)
-            
-            
-            cmds.connectAttr(rotationA + ".worldMatrix", controlA + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(mult + ".matrixSum", controlB + ".offsetParentMatrix")
-        '''   
-            
-            
-        
-    # Calls all the helper function to actually create the joints
-    createHeadJoints(len(allSpines))
-    createLegJoints()
-    createArmJoints(len(allSpines))
-    createFingerJoints(len(allFingers))
-    
-
-# Creates all the head joints including the eyes and jaw
-def createHeadJoints(spineAmount):
-    # Find all the head locators
-    allHead = cmds.ls("LOC_C_head_*", type="locator")
-    head = cmds.listRelatives(*allHead, parent=True, fullPath=True)
-    
-    # Loop through all head locators and create joints
-    for i, h in enumerate(head):
-        # This is a special case since the neck joint is parented to the last spine joint
-        if i == 0:
-            # Creates a joint name variable to make the creation process easier to iterate
-            # The joint names are determined based upon the allHead and head variables above
-            jointAName = "JNT_spine_" + str(spineAmount - 1)
-            jointBName = "JNT_C_head_" + str(i)
-            
-            # Creates the joints using a similar setup to the names for ease of iteration
-            # Note that joint A already exists
-            jointA = "JNT_spine_" + str(spineAmount - 1)
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            # Finds the appropiate locator and stores it as a variable
-            locatorA = "LOC_spine_" + str(spineAmount - 1)
-            locatorB = "LOC_C_head_" + str(i)
-            
-            # Creates the transform node that will be used to store the rest position and rotation
-            # Note that rotation A already exists. It only needs to be created with the first joint
-            # It will already exist for all other joints
-            rotationA = "JNT_spine_" + str(spineAmount - 1) + "_REST"
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            # These nodes do all the necessary math for the OPM setup to work properly
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            # This is where the magic happens! Through these connections in the node editor,
-            # the joint is able to stay zeroed out and oriented properly while passing off
-            # all of the transformation values to the rest group made above
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            # Note that rotation A now uses its parentInverseMatrix instead of the worldInverseMatrix
-            # This is because it has a parent that is NOT the world
-            cmds.connectAttr(rotationA + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationA + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        # All other head joints can be created without any special situation to account for
-        else:
-            # I use B and C instead of A and B to avoid confusion with the above if statement
-            # Joint B is the same joint used above, but now it is the parent instead of the child.
-            # For all iterations Joint B will always be the parent of Joint C
-            jointBName = "JNT_C_head_" + str(i - 1)
-            jointCName = "JNT_C_head_" + str(i)
-            
-            # Joint B alredy exists so the variable is updated by always storing the joint that is at i - 1
-            jointB = "JNT_C_head_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            # The locators are always at position i and i - 1
-            locatorB = "LOC_C_head_" + str(i - 1)
-            locatorC = "LOC_C_head_" + str(i)
-            
-            # Rest B already exists so the variable is updated by always storing the joint that is at i - 1
-            rotationB = "JNT_C_head_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            # You always need a new version of each of these nodes each iteration
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            # This is where the magic happens! Through these connections in the node editor,
-            # the joint is able to stay zeroed out and oriented properly while passing off
-            # all of the transformation values to the rest group made above
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)
-        
-        
-    # Calls helper functions to create the jaw and eyes
-    createJawJoints()
-    createEyeJoints()
-
-
-# Creates the jaw joints
-def createJawJoints():
-    # Find all the jaw locators
-    allJaw = cmds.ls("LOC_C_jaw_*", type="locator")
-    jaw = cmds.listRelatives(*allJaw, parent=True, fullPath=True)
-    
-    # Loop through all jaw locators and create joints
-    for i, j in enumerate(jaw):
-        if i == 0:
-            jointAName = "JNT_C_head_1" 
-            jointBName = "JNT_C_jaw_" + str(i)
-            
-            jointA = "JNT_C_head_1"
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            locatorA = "LOC_C_head_1"
-            locatorB = "LOC_C_jaw_" + str(i)
-            
-            rotationA = "JNT_C_head_1_REST"
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationA + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        else:
-            jointBName = "JNT_C_jaw_" + str(i - 1)
-            jointCName = "JNT_C_jaw_" + str(i)
-            
-            jointB = "JNT_C_jaw_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            locatorB = "LOC_C_jaw_" + str(i - 1)
-            locatorC = "LOC_C_jaw_" + str(i)
-            
-            rotationB = "JNT_C_jaw_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)
-
-
-# Creates the eye joints
-def createEyeJoints():
-    ###########
-    # Left Eye
-    ###########
-    # Find all the left eye locators
-    allLeftEye = cmds.ls("LOC_L_eye_*", type="locator")
-    leftEye = cmds.listRelatives(*allLeftEye, parent=True, fullPath=True)
-    
-    # Loop through left eye locators and create joints
-    for i, L_eye in enumerate(leftEye):
-        if i == 0:
-            jointAName = "JNT_C_head_1" 
-            jointBName = "JNT_L_eye_" + str(i)
-            
-            jointA = "JNT_C_head_1"
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            locatorA = "LOC_C_head_1"
-            locatorB = "LOC_L_eye_" + str(i)
-            
-            rotationA = "JNT_C_head_1_REST"
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationA + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        else:
-            jointBName = "JNT_L_eye_" + str(i - 1)
-            jointCName = "JNT_L_eye_" + str(i)
-            
-            jointB = "JNT_L_eye_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            locatorB = "LOC_L_eye_" + str(i - 1)
-            locatorC = "LOC_L_eye_" + str(i)
-            
-            rotationB = "JNT_L_eye_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)
-        
-    ############
-    # Right Eye
-    ############
-    # Find all the right eye locators
-    allRightEye = cmds.ls("LOC_R_eye_*", type="locator")
-    rightEye = cmds.listRelatives(*allRightEye, parent=True, fullPath=True)
-    
-    # Loop through right eye locators and create joints
-    for i, R_eye in enumerate(rightEye):
-        if i == 0:
-            jointAName = "JNT_C_head_1" 
-            jointBName = "JNT_R_eye_" + str(i)
-            
-            jointA = "JNT_C_head_1"
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            locatorA = "LOC_C_head_1"
-            locatorB = "LOC_R_eye_" + str(i)
-            
-            rotationA = "JNT_C_head_1_REST"
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationA + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-            
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        else:
-            jointBName = "JNT_R_eye_" + str(i - 1)
-            jointCName = "JNT_R_eye_" + str(i)
-            
-            jointB = "JNT_R_eye_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            locatorB = "LOC_R_eye_" + str(i - 1)
-            locatorC = "LOC_R_eye_" + str(i)
-            
-            rotationB = "JNT_R_eye_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)
-        
-
-# Creates all the leg joints
-def createLegJoints():
-    ###########
-    # Left Leg
-    ###########
-    # Finds all the left leg locators
-    allLeftLeg = cmds.ls("LOC_L_leg_*", type="locator")
-    leftLeg = cmds.listRelatives(*allLeftLeg, parent=True, fullPath=True)
-    
-    # Loops through all left leg locators to create joints
-    for i, L_leg in enumerate(leftLeg):
-        if i == 0:
-            jointAName = "JNT_root"
-            jointBName = "JNT_L_leg_" + str(i)
-            
-            jointA = "JNT_root"
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            locatorA = "LOC_root"
-            locatorB = "LOC_L_leg_" + str(i)
-            
-            rotationA = "JNT_root_REST"
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationA + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        else:
-            jointBName = "JNT_L_leg_" + str(i - 1)
-            jointCName = "JNT_L_leg_" + str(i)
-            
-            jointB = "JNT_L_leg_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            locatorB = "LOC_L_leg_" + str(i - 1)
-            locatorC = "LOC_L_leg_" + str(i)
-            
-            rotationB = "JNT_L_leg_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)
-    ############
-    # Right Leg
-    ############
-    # Finds all the right leg locators
-    allRightLeg = cmds.ls("LOC_R_leg_*", type="locator")
-    rightLeg = cmds.listRelatives(*allRightLeg, parent=True, fullPath=True)
-    
-    # Loops through all right leg locators to create joints
-    for i, R_leg in enumerate(rightLeg):
-        if i == 0:
-            jointAName = "JNT_root"
-            jointBName = "JNT_R_leg_" + str(i)
-            
-            jointA = "JNT_root"
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            locatorA = "LOC_root"
-            locatorB = "LOC_R_leg_" + str(i)
-            
-            rotationA = "JNT_root_REST"
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationA + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        else:
-            jointBName = "JNT_R_leg_" + str(i - 1)
-            jointCName = "JNT_R_leg_" + str(i)
-            
-            jointB = "JNT_R_leg_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            locatorB = "LOC_R_leg_" + str(i - 1)
-            locatorC = "LOC_R_leg_" + str(i)
-            
-            rotationB = "JNT_R_leg_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)
-    
-    
-# Creates all the arm joints
-def createArmJoints(spineAmount):
-    ###########
-    # Left Arm
-    ###########
-    # Finds all of the left arm locators
-    allLeftArm = cmds.ls("LOC_L_arm_*", type="locator")
-    leftArm = cmds.listRelatives(*allLeftArm, parent=True, fullPath=True)
-   
-    # Loops through all left arm locators to create joints
-    for i, L_arm in enumerate(leftArm):
-        if i == 0:
-            jointAName = "JNT_spine_" + str(spineAmount - 1)
-            jointBName = "JNT_L_arm_" + str(i)
-            
-            jointA = "JNT_spine_" + str(spineAmount - 1)
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            locatorA = "LOC_spine_" + str(spineAmount - 1)
-            locatorB = "LOC_L_leg_" + str(i)
-            
-            rotationA = "JNT_spine_" + str(spineAmount - 1) + "_REST"
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationA + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        else:
-            jointBName = "JNT_L_arm_" + str(i - 1)
-            jointCName = "JNT_L_arm_" + str(i)
-            
-            jointB = "JNT_L_arm_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            locatorB = "LOC_L_arm_" + str(i - 1)
-            locatorC = "LOC_L_arm_" + str(i)
-            
-            rotationB = "JNT_L_arm_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)
-    ###########
-    # Right Arm
-    ###########
-    # Finds all of the right arm locators
-    allRightArm = cmds.ls("LOC_R_arm_*", type="locator")
-    rightArm = cmds.listRelatives(*allRightArm, parent=True, fullPath=True)
-    
-    # Loops through all right arm locators to create joints
-    for i, R_arm in enumerate(rightArm):
-        if i == 0:
-            jointAName = "JNT_spine_" + str(spineAmount - 1)
-            jointBName = "JNT_R_arm_" + str(i)
-            
-            jointA = "JNT_spine_" + str(spineAmount - 1)
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            locatorA = "LOC_spine_" + str(spineAmount - 1)
-            locatorB = "LOC_R_leg_" + str(i)
-            
-            rotationA = "JNT_spine_" + str(spineAmount - 1) + "_REST"
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationA + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        else:
-            jointBName = "JNT_R_arm_" + str(i - 1)
-            jointCName = "JNT_R_arm_" + str(i)
-            
-            jointB = "JNT_R_arm_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            locatorB = "LOC_R_arm_" + str(i - 1)
-            locatorC = "LOC_R_arm_" + str(i)
-            
-            rotationB = "JNT_R_arm_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)
-      
-
-# Helper function that tells the createFinger function how many fingers to make
-def createFingerJoints(fingerAmount):
-    for finger in range(0, fingerAmount):
-        createFinger(finger)
-        
-
-# Creates the finger joints        
-def createFinger(finger):
-    ############
-    # Left Hand
-    ############
-    # Finds all of the left finger locators
-    allLeftFingers = cmds.ls("LOC_L_finger_" + str(finger) + "_*", type="locator")
-    leftFinger = cmds.listRelatives(*allLeftFingers, parent=True, fullPath=True)
-    
-    # Loop through each finger to create the joints
-    for i, L_finger in enumerate(leftFinger):
-        if i == 0:
-            jointAName = "JNT_L_arm_3"
-            jointBName = "JNT_L_finger_" + str(finger) + "_" + str(i)
-            
-            jointA = "JNT_L_arm_3"
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            locatorA = "LOC_L_arm_3"
-            locatorB = "LOC_L_finger_" + str(finger) + "_" + str(i)
-            
-            rotationA = "JNT_L_arm_3_REST"
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationA + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        else:
-            jointBName = "JNT_L_finger_" + str(finger) + "_" + str(i - 1)
-            jointCName = "JNT_L_finger_" + str(finger) + "_" + str(i)
-            
-            jointB = "JNT_L_finger_" + str(finger) + "_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            locatorB = "LOC_L_finger_" + str(finger) + "_" + str(i - 1)
-            locatorC = "LOC_L_finger_" + str(finger) + "_" + str(i)
-            
-            rotationB = "JNT_L_finger_" + str(finger) + "_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)    
-    ############
-    # Right Hand
-    ############
-    # Finds all of the right finger locators
-    allRightFingers = cmds.ls("LOC_R_finger_" + str(finger) + "_*", type="locator")
-    rightFinger = cmds.listRelatives(*allRightFingers, parent=True, fullPath=True)
-    
-    # Loop through each finger to create the joints
-    for i, R_finger in enumerate(rightFinger):
-        if i == 0:
-            jointAName = "JNT_R_arm_3"
-            jointBName = "JNT_R_finger_" + str(finger) + "_" + str(i)
-            
-            jointA = "JNT_R_arm_3"
-            jointB = cmds.createNode("joint", name=jointBName, parent=jointA)
-            
-            locatorA = "LOC_R_arm_3"
-            locatorB = "LOC_R_finger_" + str(finger) + "_" + str(i)
-            
-            rotationA = "JNT_R_arm_3_REST"
-            rotationB = cmds.createNode("transform", name=jointBName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorA + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorB + ".worldMatrix", rotationB + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationB + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationA + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointB + ".offsetParentMatrix", force=True)
-        else:
-            jointBName = "JNT_R_finger_" + str(finger) + "_" + str(i - 1)
-            jointCName = "JNT_R_finger_" + str(finger) + "_" + str(i)
-            
-            jointB = "JNT_R_finger_" + str(finger) + "_" + str(i - 1)
-            jointC = cmds.createNode("joint", name=jointCName, parent=jointB)
-            
-            locatorB = "LOC_R_finger_" + str(finger) + "_" + str(i - 1)
-            locatorC = "LOC_R_finger_" + str(finger) + "_" + str(i)
-            
-            rotationB = "JNT_R_finger_" + str(finger) + "_" + str(i - 1) + "_REST"
-            rotationC = cmds.createNode("transform", name=jointCName + "_REST", parent="opmStorage_GRP")
-            
-            aim = cmds.createNode("aimMatrix")
-            mult = cmds.createNode("multMatrix")
-            
-            cmds.connectAttr(locatorB + ".worldMatrix", aim + ".inputMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", aim + ".primaryTargetMatrix", force=True)
-            cmds.connectAttr(locatorC + ".worldMatrix", rotationC + ".offsetParentMatrix", force=True)
-            cmds.connectAttr(rotationC + ".worldMatrix", mult + ".matrixIn[0]", force=True)
-            cmds.connectAttr(rotationB + ".parentInverseMatrix", mult + ".matrixIn[1]", force=True)
-
-            cmds.connectAttr(aim + ".outputMatrix", rotationB + ".offsetParentMatrix", force=True)
-
-            cmds.connectAttr(mult + ".matrixSum", jointC + ".offsetParentMatrix", force=True)
-
-
-# Function to delete all joints
-def deleteJoints():
-    allJoints = cmds.ls("JNT_*")
-    cmds.delete(allJoints)
+import maya.cmds as cmds
+import locators
+import templates
+import builders
+import profiler
+import registry
+import ownership
+import plan
+
+
+# Joint plans by config hash, see planJoints
+jointPlans = {}
+
+
+# Function to create all joints for the rig
+# config is the RigConfig of the locators, when not provided it is found from the locators in the scene
+# backend is "cmds" to issue one maya.cmds call per node and connection, or "api" to queue
+# everything into a single OpenMaya modifier. Both build the same node network
+# namespace is the one the locators were created with, the joints get the same one
+# lean builds the network with a multMatrix only where one is needed, see createChainJoints
+# Returns the number of nodes made, 0 when the joints could not be built
+def createJoints(config=None, backend="cmds", namespace="", lean=False):
+    steps = createJointSteps(config, backend, namespace, lean)
+    with profiler.phase("createJoints"):
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                return stop.value
+
+
+# Same as createJoints but one chain at a time, the name of each chain is yielded once its joints are
+# made so a build can be spread over several idle events, see deferredBuild.py
+# Closing the generator before the end deletes the joints made so far
+# The generator returns the number of nodes made, 0 when the joints could not be built
+def createJointSteps(config=None, backend="cmds", namespace="", lean=False):
+    if cmds.objExists(namespace + "JNT_GRP"):
+        print("The joint group already exists!")
+        return 0
+
+    # The whole joint network is planned before anything is made, then checked against the locators
+    jointPlan, config = checkedPlan(config, namespace, lean)
+    if jointPlan is None:
+        return 0
+
+    # Creates empty joint group
+    locators.prepareNamespace(namespace)
+    jointGroup = cmds.group(empty=True, name=namespace + "JNT_GRP")
+
+    # The plan is made one chain at a time so every chain is a phase when profiling
+    # Phases are closed before every yield since other builds can run until the next step
+    builder = builders.getBuilder(backend)
+    try:
+        for chain, chainPlan in chainPlans(jointPlan, templates.expandSkeleton(config, namespace=namespace)):
+            with profiler.phase(chain.name):
+                chainPlan.execute(builder)
+            yield chain.name
+
+        with profiler.phase("commit"):
+            builder.finish()
+            ownership.addOwnedNodes(namespace + ownership.JOINT_CONTAINER, [jointGroup] + builder.createdNodes)
+    except GeneratorExit:
+        # Nodes queued by the api builder were never made, so only the nodes that exist are deleted
+        cmds.delete(cmds.ls([jointGroup] + builder.createdNodes))
+        raise
+    return len(builder.createdNodes)
+
+
+# The part of a plan that makes each chain as (chain, plan) pairs
+# Chains in build order only connect to nodes made before them, so the parts can be made one by one
+def chainPlans(jointPlan, chains):
+    return zip(chains, jointPlan.split([chainNodeNames([chain]) for chain in chains]))
+
+
+# Returns the plan of a config checked against the locators of the namespace, and the config which is
+# found from the locators when not provided. The plan is None when the joints cannot be built
+def checkedPlan(config, namespace="", lean=False):
+    # Locators are looked up in the registry instead of being searched for in the scene
+    locatorRegistry = locators.getRegistry(namespace)
+    if config is None:
+        config = locatorRegistry.config()
+
+    problems = configProblems(config, locatorRegistry)
+    if not problems:
+        with profiler.phase("plan"):
+            jointPlan = planJoints(config, namespace, lean)
+            problems = jointPlan.validate(existing=locatorRegistry.names() + [namespace + "opmStorage_GRP"])
+    if problems:
+        print("The joints cannot be built!\n" + "\n".join(problems))
+        return None, config
+    return jointPlan, config
+
+
+# Problems that stop the skeleton of a config from being expanded at all, empty when there are none
+# Without locators the config found from the scene has no spine, which the other chains hang from
+def configProblems(config, locatorRegistry):
+    if not len(locatorRegistry):
+        return ["No locators found, create the locators first"]
+    if config.spineCount < 1:
+        return ["No spine locators found, the spine count has to be at least 1"]
+    return []
+
+
+# Updates the joints of an existing rig to the current locators and only rebuilds the chains that changed
+# A chain is rebuilt when its joints, parent or aim targets differ from the rig in the scene and every
+# chain below a rebuilt chain is rebuilt with it, so adding a finger only builds the new finger chains
+# Makes a new rig when there is none yet
+# Both networks give the same pose so lean only changes the chains that are rebuilt
+def updateJoints(config=None, backend="cmds", namespace="", lean=False):
+    if not cmds.objExists(namespace + "JNT_GRP"):
+        return createJoints(config, backend, namespace, lean)
+
+    locatorRegistry = locators.getRegistry(namespace)
+    if config is None:
+        config = locatorRegistry.config()
+    problems = configProblems(config, locatorRegistry)
+    if problems:
+        print("The joints cannot be updated!\n" + "\n".join(problems))
+        return 0
+    builder = builders.getBuilder(backend)
+
+    with profiler.phase("updateJoints"):
+        # The rig in the scene is expanded from the joint counts so both sides can be compared in Python
+        jointRegistry = registry.fromScene(namespace + "JNT_root", namespace + "JNT_", "joint", allDescendents=True)
+        builtChains = {}
+        if len(jointRegistry):
+            for chain in templates.expandSkeleton(jointRegistry.config(), namespace=namespace):
+                builtChains[chain.key] = chain
+
+        # _REST nodes are stored with the locators, chains that lost them with a deleted locator are rebuilt
+        restNodes = [chain.jointName(i) + "_REST" for chain in builtChains.values() for i in range(len(chain))]
+        existingRestNodes = set(cmds.ls(restNodes))
+
+        changedChains = []
+        changedKeys = set()
+        chains = templates.expandSkeleton(config, namespace=namespace)
+        for chain in chains:
+            built = builtChains.pop(chain.key, None)
+            parentChanged = chain.parent is not None and chain.parent.key in changedKeys
+            if (built is None or parentChanged or chainSignature(built) != chainSignature(chain)
+                    or not all(chain.jointName(i) + "_REST" in existingRestNodes for i in range(len(chain)))):
+                changedChains.append(chain)
+                changedKeys.add(chain.key)
+                if built is not None:
+                    builtChains[chain.key] = built
+
+        # The changed chains are planned and checked before anything is deleted, so an update that cannot
+        # be built leaves the rig as it was. The nodes of builtChains are about to be deleted, so they
+        # do not count as inputs that are in the scene
+        with profiler.phase("plan"):
+            chainPlan = planChains(changedChains, templateRegistry(chains, namespace), lean)
+            deleted = set(chainNodeNames(builtChains.values()))
+            existing = [node for node in cmds.ls(chainPlan.inputs()) if node not in deleted]
+            problems = chainPlan.validate(existing=existing)
+        if problems:
+            print("The joints cannot be updated!\n" + "\n".join(problems))
+            return 0
+
+        # What is left in builtChains are the chains that are gone and the old versions of the changed chains
+        with profiler.phase("delete"):
+            deleteChainJoints(builtChains.values())
+
+        for chain, changedPlan in chainPlans(chainPlan, changedChains):
+            with profiler.phase(chain.name):
+                changedPlan.execute(builder)
+
+        with profiler.phase("commit"):
+            builder.finish()
+            ownership.addOwnedNodes(namespace + ownership.JOINT_CONTAINER, builder.createdNodes)
+
+    return len(changedChains)
+
+
+# Works out the joint network of a config without touching the scene and returns it as a plan.BuildPlan
+# The locator names come from the skeleton template, so a config is planned once and the plan is reused
+# by every later build of the same config
+def planJoints(config, namespace="", lean=False):
+    key = plan.configHash(config, namespace=namespace, lean=lean)
+    if key not in jointPlans:
+        chains = templates.expandSkeleton(config, namespace=namespace)
+        jointPlans[key] = planChains(chains, templateRegistry(chains, namespace), lean)
+    return jointPlans[key]
+
+
+# Registry of the locator names of the chains as the template names them, whether they exist or not
+# Plans made with it list missing locators as inputs, which validate reports, instead of failing
+def templateRegistry(chains, namespace=""):
+    locatorRegistry = registry.NodeRegistry(namespace + "LOC_")
+    for chain in chains:
+        for i in range(len(chain)):
+            locatorRegistry.add(chain.key, i, chain.locatorName(i))
+    return locatorRegistry
+
+
+# Plan of the joints of some chains, the locators of the chains and their aim targets are in locatorRegistry
+def planChains(chains, locatorRegistry, lean=False):
+    recording = builders.RecordingBuilder()
+    createChains(chains, recording, locatorRegistry, lean)
+    return plan.fromRecording(recording)
+
+
+# Creates the joints of the chains in order
+def createChains(chains, builder, locatorRegistry, lean=False):
+    for chain in chains:
+        createChainJoints(chain, builder, locatorRegistry, lean)
+
+
+# Records the joint build of a config without touching the scene and returns the RecordingBuilder
+# The recorded calls are the expected joint graph, they can be saved and replayed with replayJoints
+def recordJoints(config, locatorRegistry, namespace="", lean=False):
+    recording = builders.RecordingBuilder()
+    createChains(templates.expandSkeleton(config, namespace=namespace), recording, locatorRegistry, lean=lean)
+    return recording
+
+
+# Builds the joints by replaying recorded calls, which skips expanding and working out the skeleton
+# namespace is prepended to every node name of calls that were recorded without one
+def replayJoints(recording, backend="cmds", namespace=""):
+    if cmds.objExists(namespace + "JNT_GRP"):
+        print("The joint group already exists!")
+        return 0
+    locators.prepareNamespace(namespace)
+    jointGroup = cmds.group(empty=True, name=namespace + "JNT_GRP")
+
+    builder = builders.getBuilder(backend)
+    with profiler.phase("replayJoints"):
+        recording.replay(builder, (lambda name: namespace + name) if namespace else None)
+        with profiler.phase("commit"):
+            builder.finish()
+            ownership.addOwnedNodes(namespace + ownership.JOINT_CONTAINER, [jointGroup] + builder.createdNodes)
+
+
+# Everything that decides the nodes and connections of a chain: its joints, parent joint and aim targets
+def chainSignature(chain):
+    parentJoint = chain.parent.jointName(chain.parentIndex) if chain.parent is not None else None
+    aims = [aim[0].locatorName(aim[1]) if aim else None for aim in chain.aims]
+    return ([chain.jointName(i) for i in range(len(chain))], parentJoint, chain.parentSpace, aims)
+
+
+# Names of the joints of the chains together with their _REST, _AIM and _MULT nodes
+# Segments without an aim or a parent have no _AIM or _MULT node but their names are in the list
+def chainNodeNames(chains):
+    names = []
+    for chain in chains:
+        for i in range(len(chain)):
+            jointName = chain.jointName(i)
+            names.extend([jointName, jointName + "_REST", jointName + "_AIM", jointName + "_MULT"])
+    return names
+
+
+# Deletes the joints of the chains together with their _REST, _AIM and _MULT nodes
+def deleteChainJoints(chains):
+    # Only the nodes found are deleted
+    existing = cmds.ls(chainNodeNames(chains))
+    if existing:
+        cmds.delete(existing)
+
+
+# Creates the joints of a single chain, the locators of its segments are found in locatorRegistry
+# lean skips the multMatrix of every joint whose offset is taken in parentInverseMatrix space, which is
+# every joint but the first spine joint. The _REST nodes all sit under opmStorage_GRP so their
+# parentInverseMatrix is the inverse of opmStorage_GRP and cancels out the group in the rest matrix,
+# leaving the matrix that drives the _REST node. That matrix goes straight into the joint instead
+def createChainJoints(chain, builder, locatorRegistry, lean=False):
+    for i in range(len(chain)):
+        jointName = chain.jointName(i)
+        locator = locatorRegistry.get(chain.key, i)
+
+        # The joint is parented to the previous joint of the chain, or to the parent chain for the first joint
+        if i > 0:
+            parentJoint = chain.jointName(i - 1)
+            parentSpace = "parentInverseMatrix"
+        elif chain.parent is not None:
+            parentJoint = chain.parent.jointName(chain.parentIndex)
+            parentSpace = chain.parentSpace
+        else:
+            parentJoint = None
+
+        # Creates the joint and the transform node that will be used to store the rest position and rotation
+        joint = builder.createNode("joint", name=jointName, parent=parentJoint)
+        rotation = builder.createNode("transform", name=jointName + "_REST", parent=chain.namespace + "opmStorage_GRP")
+
+        # Segments that point at another locator get an aimMatrix for their rest rotation
+        # The last segment of a chain only stores the position of its locator
+        aimTarget = chain.aims[i]
+        if aimTarget:
+            targetChain, targetIndex = aimTarget
+            aim = builder.createNode("aimMatrix", name=jointName + "_AIM")
+            builder.connect(locator, "worldMatrix", aim, "inputMatrix")
+            builder.connect(locatorRegistry.get(targetChain.key, targetIndex), "worldMatrix", aim, "primaryTargetMatrix")
+            builder.connect(aim, "outputMatrix", rotation, "offsetParentMatrix")
+            restSource = (aim, "outputMatrix")
+        else:
+            builder.connect(locator, "worldMatrix", rotation, "offsetParentMatrix")
+            restSource = (locator, "worldMatrix")
+
+        # The root joint has no parent so it takes the rest matrix directly
+        if not parentJoint:
+            builder.connect(rotation, "worldMatrix", joint, "offsetParentMatrix")
+            continue
+
+        if lean and parentSpace == "parentInverseMatrix":
+            builder.connect(restSource[0], restSource[1], joint, "offsetParentMatrix")
+            continue
+
+        # This is where the magic happens! Through these connections in the node editor,
+        # the joint is able to stay zeroed out and oriented properly while passing off
+        # all of the transformation values to the rest group made above
+        mult = builder.createNode("multMatrix", name=jointName + "_MULT")
+        builder.connect(rotation, "worldMatrix", mult, "matrixIn[0]")
+        builder.connect(parentJoint + "_REST", parentSpace, mult, "matrixIn[1]")
+        builder.connect(mult, "matrixSum", joint, "offsetParentMatrix")
+
+
+# Function to delete all joints of a namespace with their _REST, _AIM and _MULT nodes in a single delete
+# Rigs built before the nodes were tracked, and failed builds that never added their nodes to the
+# container, fall back to deleting everything named JNT_*
+def deleteJoints(namespace=""):
+    if ownership.deleteOwned(namespace + ownership.JOINT_CONTAINER) and not cmds.objExists(namespace + "JNT_GRP"):
+        return
+    allJoints = cmds.ls(namespace + "JNT_*")
+    if allJoints:
+        cmds.delete(allJoints)
@@ -0,0 +1,150 @@
+# Default locator layout of a rig computed as arrays
+#
+# The positions of a single config are the ones templates.expandSkeleton works out for the chains,
+# a build never solves them a second time. For batches every locator is one row of a (locators, 3)
+# position array. Offsets are solved for the left side in one pass per hierarchy level and the right
+# side is mirrored by flipping the sign of the X column. A whole batch of proportion variants can be
+# solved at once, which makes it possible to generate and validate thousands of procedural characters
+# without Maya.
+#
+# NumPy is optional and only computeVariants and validateLayouts need it. It is imported the first
+# time one of them runs, since it takes longer to import than the whole tool.
+#
+# Example:
+#     rigLayout = layout.computeLayout(RigConfig(spineCount=6))
+#     variants = numpy.random.uniform(0.8, 1.2, (5000, len(rigLayout.proportionNames)))
+#     positions = rigLayout.computeVariants(variants)
+#     valid = layout.validateLayouts(positions)
+import templates
+
+# Set by importNumpy, None until then and when NumPy is not installed
+numpy = None
+numpyImported = False
+
+
+def importNumpy():
+    global numpy, numpyImported
+    if not numpyImported:
+        numpyImported = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+    return numpy
+
+
+# Locator names, positions and scales of a config in build order
+class Layout():
+    def __init__(self, rigConfig, chains):
+        self.config = rigConfig
+        self.chains = chains
+        self.names = []
+        self.scales = []
+        # Chain key -> slice of the rows of that chain
+        self.chainRows = {}
+        # Template chain names that proportions can be set for, the columns of computeVariants
+        self.proportionNames = []
+        # Solve arrays of computeVariants, built the first time it runs
+        self.levels = None
+
+        for chain in chains:
+            start = len(self.names)
+            self.names.extend(chain.locatorName(i) for i in range(len(chain)))
+            self.scales.extend([chain.scale] * len(chain))
+            self.chainRows[chain.key] = slice(start, len(self.names))
+            if not chain.worldSpace and chain.name not in self.proportionNames:
+                self.proportionNames.append(chain.name)
+
+        self.positions = [position for chain in chains for position in chain.positions]
+
+
+    def __len__(self):
+        return len(self.names)
+
+
+    # Positions of the rows of a single chain
+    def chainPositions(self, chain):
+        return self.positions[self.chainRows[chain.key]]
+
+
+    # Proportions of the config in the column order of proportionNames
+    def configProportions(self):
+        return importNumpy().array([self.config.proportion(name) for name in self.proportionNames])
+
+
+    # Lays out the offsets of all rows and the row each one is relative to
+    def _buildArrays(self):
+        count = len(self.names)
+        self.offsets = numpy.zeros((count, 3))
+        # X sign of every row, -1 mirrors the right side
+        self.signs = numpy.ones(count)
+        # Column of proportionNames that scales each row, -1 for world space rows
+        self.proportionColumns = numpy.full(count, -1)
+
+        depths = {}
+        levels = {}
+        for chain in self.chains:
+            rows = self.chainRows[chain.key]
+            self.offsets[rows] = chain.offsets
+            if chain.side == "R":
+                self.signs[rows] = -1.0
+            if chain.worldSpace:
+                continue
+
+            self.proportionColumns[rows] = self.proportionNames.index(chain.name)
+            # Rows are solved level by level so the row they are relative to is always finished first
+            depth = depths.get(chain.parent.key, 0) + 1
+            depths[chain.key] = depth
+            anchor = self.chainRows[chain.parent.key].start + chain.parentIndex
+            rowList, anchorList = levels.setdefault(depth, ([], []))
+            rowList.extend(range(rows.start, rows.stop))
+            anchorList.extend([anchor] * (rows.stop - rows.start))
+
+        self.levels = [(numpy.array(levels[depth][0]), numpy.array(levels[depth][1])) for depth in sorted(levels)]
+
+
+    # Solves the positions for a batch of proportions, one row per variant with a column per proportionNames
+    # Returns an array of shape (variants, locators, 3)
+    def computeVariants(self, proportions):
+        if importNumpy() is None:
+            raise ImportError("computeVariants needs NumPy")
+        if self.levels is None:
+            self._buildArrays()
+
+        proportions = numpy.asarray(proportions, dtype=float)
+        # World space rows only follow the scale, the extra column of ones is used for them
+        columns = numpy.concatenate([proportions, numpy.ones((len(proportions), 1))], axis=1)
+        multipliers = columns[:, self.proportionColumns] * self.config.scale
+
+        positions = self.offsets[numpy.newaxis] * multipliers[:, :, numpy.newaxis]
+        for rows, anchors in self.levels:
+            positions[:, rows] += positions[:, anchors]
+
+        # Everything is solved for the left side, the right side is a sign flip of the X column
+        positions[:, :, 0] *= self.signs
+        return positions
+
+
+def computeLayout(rigConfig, namespace=""):
+    return Layout(rigConfig, templates.expandSkeleton(rigConfig, namespace=namespace))
+
+
+# Checks a batch of layouts of shape (variants, locators, 3) and returns a boolean per variant
+# A layout is valid if every position is finite, nothing is below the ground and
+# no two locators are closer than minimumDistance
+def validateLayouts(positions, minimumDistance=0.01, chunkSize=64):
+    if importNumpy() is None:
+        raise ImportError("validateLayouts needs NumPy")
+
+    positions = numpy.asarray(positions)
+    valid = numpy.isfinite(positions).all(axis=(1, 2)) & (positions[:, :, 1] >= -1e-6).all(axis=1)
+
+    # Pairwise distances are done in chunks of variants to keep the memory use small
+    count = positions.shape[1]
+    upper = numpy.triu_indices(count, 1)
+    for start in range(0, len(positions), chunkSize):
+        chunk = positions[start:start + chunkSize]
+        differences = chunk[:, :, numpy.newaxis] - chunk[:, numpy.newaxis]
+        distances = numpy.sqrt((differences ** 2).sum(axis=3))[:, upper[0], upper[1]]
+        valid[start:start + chunkSize] &= distances.min(axis=1) >= minimumDistance
+    return valid
@@ -1,331 +1,254 @@
-import maya.cmds as cmds
-
-# Creates the fields where user can set the amount of spine and finger joints
-def createFields():
-    
-    global spineCount
-    global fingerCount
-    
-    cmds.text("Spine Count", label="Spine Count")
-    spineCount = cmds.intField(minValue=1, maxValue=11, value=4)
-
-    cmds.text("Finger Count", label="Finger Count")
-    fingerCount = cmds.intField(minValue=1, maxValue=11, value=5)
-
-
-# Function to create all the OPM locators for the rig
-def createLocators():
-    
-    global opmStorageGroup
-    
-    if cmds.objExists("opmStorage_GRP"):
-        print("The locator group already exists!")
-        return 0
-    else:
-        # Creates OPM storage group
-        opmStorageGroup = cmds.group(empty=True, name="opmStorage_GRP")
-
-    # Creates the root locator and parents it to opmStorage_GRP
-    rootLocator = cmds.spaceLocator(name="LOC_root")
-    cmds.scale(0.15, 0.15, 0.15, rootLocator)
-    cmds.move(0, 2.5, 0, rootLocator)
-    cmds.parent(rootLocator, opmStorageGroup)
-
-    # Calls to each helper function below. The 1 value indicates left (1) or right (-1)
-    createSpine()
-    createHead()
-    createLeg(1)
-    createLeg(-1)
-    createArm(1)
-    createArm(-1)
-
-
-# Creates the spine locators based upon the provided value by the user
-def createSpine():
-    for i in range(0, cmds.intField(spineCount, query=True, value=True)):
-        # Creates LOC_spine_# and parents it to opmStorage_GRP
-        spine = cmds.spaceLocator(name="LOC_spine_" + str(i))  # Example: LOC_spine_1
-        cmds.scale(0.1, 0.1, 0.1, spine)
-        cmds.parent(spine, opmStorageGroup)  
-        cmds.move(0, 2.75 + (0.25 * i), 0, spine)
-
-        
-# Creates locators for the head
-# Eyes and jaw are handled seperately
-def createHead():
-    # Creates neck locator and parents it to opmStorage_GRP
-    neck = cmds.spaceLocator(name="LOC_C_head_0")
-    cmds.scale(0.1, 0.1, 0.1, neck)
-    cmds.move(0, 2.75 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, neck)
-    cmds.parent(neck, opmStorageGroup)
-        
-    # Creates face locator and parents it to opmStorage_GRP
-    face = cmds.spaceLocator(name="LOC_C_head_1")
-    cmds.scale(0.1, 0.1, 0.1, face)
-    cmds.move(0, 3.2 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, face)
-    cmds.parent(face, opmStorageGroup)
-        
-    # Creates the top of the head locator and parents it to opmStorage_GRP
-    headEnd = cmds.spaceLocator(name="LOC_C_head_2")
-    cmds.scale(0.1, 0.1, 0.1, headEnd)
-    cmds.move(0, 3.5 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, headEnd)
-    cmds.parent(headEnd, opmStorageGroup)    
-        
-    # Calls the jaw fuction to create jaw locators
-    # Calls the eye function to create both eyes using 1 for left and -1 for right
-    createJaw()
-    createEye(1)
-    createEye(-1)
-
-
-# Creates the jaw locators
-def createJaw():
-    # Creates jaw base locator and parents it to opmStorage_GRP
-    jawBase = cmds.spaceLocator(name="LOC_C_jaw_0")
-    cmds.scale(0.1, 0.1, 0.1, jawBase)
-    cmds.move(0, 3.0 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0.05, jawBase)
-    cmds.parent(jawBase, opmStorageGroup)
-        
-    # Creates the end of the jaw locator and parents it to opmStorage_GRP
-    jawEnd = cmds.spaceLocator(name="LOC_C_jaw_1")
-    cmds.scale(0.1, 0.1, 0.1, jawEnd)
-    cmds.move(0, 2.9 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0.2, jawEnd)
-    cmds.parent(jawEnd, opmStorageGroup)
-        
-
-# Creates the eye locators 
-def createEye(side):
-    ###########
-    # Left Eye
-    ###########    
-    if side == 1:
-        # Creates the left eye locator and parents it to opmStorage_GRP
-        leftEye = cmds.spaceLocator(name="LOC_L_eye_0")
-        cmds.scale(0.1,0.1,0.1, leftEye)
-        cmds.parent(leftEye, opmStorageGroup)
-        cmds.move(0.1, 3.2 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0.15, leftEye)
-            
-        # Creates the left eye end locator and parents it to opmStorage_GRP
-        leftEyeEnd = cmds.spaceLocator(name="LOC_L_eye_1")
-        cmds.scale(0.1,0.1,0.1, leftEyeEnd)
-        cmds.parent(leftEyeEnd, opmStorageGroup)
-        cmds.move(0.1 * side, 3.2 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0.3, leftEyeEnd)  
-    ############
-    # Right Eye
-    ############
-    else:
-        # Creates the right eye locator and parents it to opmStorage_GRP
-        rightEye = cmds.spaceLocator(name="LOC_R_eye_0")
-        cmds.scale(0.1,0.1,0.1, rightEye)
-        cmds.parent(rightEye, opmStorageGroup)
-        cmds.move(0.1 * side, 3.2 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0.15, rightEye)
-            
-        # Creates the right eye end locator and parents it to opmStorage_GRP
-        rightEyeEnd = cmds.spaceLocator(name="LOC_R_eye_1")
-        cmds.scale(0.1,0.1,0.1, rightEyeEnd)
-        cmds.parent(rightEyeEnd, opmStorageGroup)
-        cmds.move(0.1 * side, 3.2 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0.3, rightEyeEnd)
-    
-
-# Creates locators for both legs based upon the provided parameter (1 or -1)
-def createLeg(side):
-    ###########
-    # Left Leg
-    ###########
-    if side == 1:
-        # Creates left hip locator and parents it to opmStorage_GRP
-        leftHip = cmds.spaceLocator(name="LOC_L_leg_0")
-        cmds.scale(0.1, 0.1, 0.1, leftHip)
-        cmds.move(0.2 * side, 2.4, 0, leftHip)
-        cmds.parent(leftHip, opmStorageGroup)
-            
-        # Creates left knee locator and parents it to opmStorage_GRP
-        leftKnee = cmds.spaceLocator(name="LOC_L_leg_1")
-        cmds.scale(0.1, 0.1, 0.1, leftKnee)
-        cmds.move(0.33 * side, 1.3, 0, leftKnee)
-        cmds.parent(leftKnee, opmStorageGroup)
-
-        # Creates left ankle locator and parents it to opmStorage_GRP
-        leftAnkle = cmds.spaceLocator(name="LOC_L_leg_2")
-        cmds.scale(0.1, 0.1, 0.1, leftAnkle)
-        cmds.move(0.4 * side, 0.2, 0, leftAnkle)
-        cmds.parent(leftAnkle, opmStorageGroup)
-
-        # Creates left ball locator and parents it to opmStorage_GRP
-        leftBall = cmds.spaceLocator(name="LOC_L_leg_3")
-        cmds.scale(0.1, 0.1, 0.1, leftBall)
-        cmds.move(0.4 * side, 0, 0.2, leftBall)
-        cmds.parent(leftBall, opmStorageGroup)
-
-        # Creates left toe locator and parents it to opmStorage_GRP
-        leftToe = cmds.spaceLocator(name="LOC_L_leg_4")
-        cmds.scale(0.1, 0.1, 0.1, leftToe)
-        cmds.move(0.4 * side, 0, 0.5, leftToe)
-        cmds.parent(leftToe, opmStorageGroup)    
-    ############
-    # Right Leg
-    ############
-    else:
-        # Creates right hip locator and parents it to opmStorage_GRP
-        rightHip = cmds.spaceLocator(name="LOC_R_leg_0")
-        cmds.scale(0.1, 0.1, 0.1, rightHip)
-        cmds.move(0.2 * side, 2.4, 0, rightHip)
-        cmds.parent(rightHip, opmStorageGroup)
-
-        # Creates right knee locator and parents it to opmStorage_GRP
-        rightKnee = cmds.spaceLocator(name="LOC_R_leg_1")
-        cmds.scale(0.1, 0.1, 0.1, rightKnee)
-        cmds.move(0.33 * side, 1.3, 0, rightKnee)
-        cmds.parent(rightKnee, opmStorageGroup)
-
-        # Creates right ankle locator and parents it to opmStorage_GRP
-        rightAnkle = cmds.spaceLocator(name="LOC_R_leg_2")
-        cmds.scale(0.1, 0.1, 0.1, rightAnkle)
-        cmds.move(0.4 * side, 0.2, 0, rightAnkle)
-        cmds.parent(rightAnkle, opmStorageGroup)
-
-        # Creates right ball locator and parents it to opmStorage_GRP
-        rightBall = cmds.spaceLocator(name="LOC_R_leg_3")
-        cmds.scale(0.1, 0.1, 0.1, rightBall)
-        cmds.move(0.4 * side, 0, 0.2, rightBall)
-        cmds.parent(rightBall, opmStorageGroup)
-
-        # Creates right toe locator and parents it to opmStorage_GRP
-        rightToe = cmds.spaceLocator(name="LOC_R_leg_4")
-        cmds.scale(0.1, 0.1, 0.1, rightToe)
-        cmds.move(0.4 * side, 0, 0.5, rightToe)
-        cmds.parent(rightToe, opmStorageGroup)
-
-
-# Creates locators for both arms based upon the provided parameter (1 or -1)
-def createArm(side):
-    ###########
-    # Left Arm
-    ###########
-    if side == 1:
-        # Creates left clavicle locator and parents it to opmStorage_GRP
-        leftClavicle = cmds.spaceLocator(name="LOC_L_arm_0")
-        cmds.scale(0.1, 0.1, 0.1, leftClavicle)
-        cmds.parent(leftClavicle, opmStorageGroup)
-        cmds.move(0.25 * side, 2.75 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, leftClavicle)
-
-        # Creates left shoulder locator and parents it to opmStorage_GRP
-        leftShoulder = cmds.spaceLocator(name="LOC_L_arm_1")
-        cmds.scale(0.1, 0.1, 0.1, leftShoulder)
-        cmds.parent(leftShoulder, opmStorageGroup)
-        cmds.move(0.5 * side, 2.55 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, leftShoulder)
-            
-        # Creates left elbow locator and parents it to opmStorage_GRP
-        leftElbow = cmds.spaceLocator(name="LOC_L_arm_2")
-        cmds.scale(0.1, 0.1, 0.1, leftElbow)
-        cmds.parent(leftElbow, opmStorageGroup)
-        cmds.move(0.9 * side, 2.2 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, leftElbow)
-            
-        # Creates left wrist locator and parents it to opmStorage_GRP
-        leftWrist = cmds.spaceLocator(name="LOC_L_arm_3")
-        cmds.scale(0.1, 0.1, 0.1, leftWrist)
-        cmds.parent(leftWrist, opmStorageGroup)
-        cmds.move(1.4 * side, 1.85 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, leftWrist)
-            
-        # Calls the hand function with the provided side (1 = left) and left wrist locator)
-        createHand(1, leftWrist)
-    ############
-    # Right Arm
-    ############
-    else:    
-        # Creates right clavicle locator and parents it to opmStorage_GRP
-        rightClavicle = cmds.spaceLocator(name="LOC_R_arm_0")
-        cmds.scale(0.1, 0.1, 0.1, rightClavicle)
-        cmds.parent(rightClavicle, opmStorageGroup)
-        cmds.move(0.25 * side, 2.75 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, rightClavicle)
-            
-        # Creates right shoulder locator and parents it to opmStorage_GRP
-        rightShoulder = cmds.spaceLocator(name="LOC_R_arm_1")
-        cmds.scale(0.1, 0.1, 0.1, rightShoulder)
-        cmds.parent(rightShoulder, opmStorageGroup)
-        cmds.move(0.5 * side, 2.55 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, rightShoulder)
-            
-        # Creates right elbow locator and parents it to opmStorage_GRP
-        rightElbow = cmds.spaceLocator(name="LOC_R_arm_2")
-        cmds.scale(0.1, 0.1, 0.1, rightElbow)
-        cmds.parent(rightElbow, opmStorageGroup)
-        cmds.move(0.9 * side, 2.2 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, rightElbow)
-            
-        # Creates right wrist locator and parents it to opmStorage_GRP
-        rightWrist = cmds.spaceLocator(name="LOC_R_arm_3")
-        cmds.scale(0.1, 0.1, 0.1, rightWrist)
-        cmds.parent(rightWrist, opmStorageGroup)
-        cmds.move(1.4 * side, 1.85 + (0.25 * cmds.intField(spineCount, query=True, value=True)), 0, rightWrist)
-            
-        # Calls the hand function with the provided side (-1 = right) and  right wrist locator)
-        createHand(-1, rightWrist)
-
-
-# Fuction for creating the hands using the provided side (1 or -1) and wrist locator
-def createHand(side, wrist):
-    ############
-    # Left Hand
-    ############
-    if side == 1:
-        # Stores the position of the left wrist locator
-        leftHandPosition = cmds.xform(wrist, query=True, translation=True, worldSpace=True)
-            
-        # Calls the finger function using the side of the model, position of the hand, and provided number of desired fingers
-        for i in range(0, cmds.intField(fingerCount, query=True, value=True)):
-            createFingers(1, leftHandPosition, i)
-    #############
-    # Right Hand
-    #############
-    else:
-        # Stores the position of the right wrist locator
-        rightHandPosition = cmds.xform(wrist, query=True, translation=True, worldSpace=True)
-        
-        # Calls the finger function using the side of the model, position of the hand, and provided number of desired fingers
-        for i in range(0, cmds.intField(fingerCount, query=True, value=True)):
-            createFingers(-1, rightHandPosition, i)
-
-
-# Function used to create the individual fingers using the side, position of the hand group, and user provided finger count
-def createFingers(side, handPosition, count):
-    for x in range(0, 4):
-        ###############
-        # Left Fingers
-        ###############
-        if side == 1:
-            # Creates fingers in the form of LOC_L_finger_<finger#>_<knuckle#>
-            leftFinger = cmds.spaceLocator(name="LOC_L_finger_" + str(count) + "_" + str(x))
-            cmds.scale(0.03, 0.03, 0.03, leftFinger)
-            # Parents the knuckle LOC of each finger to opmStorage_GRP
-            cmds.parent(leftFinger, opmStorageGroup)
-            cmds.move(handPosition[0] + (0.1 + (0.1 * x)) * side, handPosition[1] - (0.1 + (0.1 * x)),
-                      handPosition[2] + -(0.05 * count), leftFinger)
-        ################
-        # Right Fingers
-        ################
-        else:
-            # Creates fingers in the form of LOC_R_finger_<finger#>_<knuckle#>
-            rightFinger = cmds.spaceLocator(name="LOC_R_finger_" + str(count) + "_" + str(x))
-            cmds.scale(0.03, 0.03, 0.03, rightFinger)
-            # Parents the knuckle LOC of each finger to opmStorage_GRP
-            cmds.parent(rightFinger, opmStorageGroup)
-            cmds.move(handPosition[0] + (0.1 + (0.1 * x)) * side, handPosition[1] - (0.1 + (0.1 * x)),
-                      handPosition[2] + -(0.05 * count), rightFinger)
-                      
-   
-# Function for mirroring user edits to locators from left to right (model's perspective)                
-def mirrorLocators():
-    allLeftLocators = cmds.ls("LOC_L_*")
-    leftLocators = cmds.listRelatives(*allLeftLocators, parent=True, fullPath=True)
-    
-    allRightLocators = cmds.ls("LOC_R_*")
-    rightLocators = cmds.listRelatives(*allRightLocators, parent=True, fullPath=True)
-    
-
-    for i, left in enumerate(leftLocators):
-        leftPosition = cmds.xform(left, query=True, translation=True, worldSpace=True)
-        cmds.move(-leftPosition[0], leftPosition[1], leftPosition[2], rightLocators[i])
-        
-
-# Removes all locators from the scene
-def deleteLocators():
-    cmds.delete("opmStorage_GRP")
+import maya.cmds as cmds
+import layout
+import builders
+import profiler
+import registry
+import ownership
+from config import RigConfig
+
+# Highest spine and finger count the fields allow
+MAX_COUNT = 99
+
+# Flattened 4x4 matrices for setAttr, MIRROR_MATRIX flips X across the YZ plane
+IDENTITY_MATRIX = [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]
+MIRROR_MATRIX = [-1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]
+
+# Registries of the locators in the scene by namespace, filled in by createLocators and updateLocators
+# A namespace has no entry until it is needed, getRegistry rebuilds it from the scene
+locatorRegistries = {}
+
+# Creates the fields where user can set the amount of spine and finger joints and the rig scale
+def createFields():
+    
+    global spineCount
+    global fingerCount
+    global rigScale
+    
+    cmds.text("Spine Count", label="Spine Count")
+    spineCount = cmds.intField(minValue=1, maxValue=MAX_COUNT, value=4)
+
+    cmds.text("Finger Count", label="Finger Count")
+    fingerCount = cmds.intField(minValue=1, maxValue=MAX_COUNT, value=5)
+
+    cmds.text("Rig Scale", label="Rig Scale")
+    rigScale = cmds.floatField(minValue=0.01, value=1.0, precision=2)
+
+
+# Reads the fields made by createFields into a RigConfig
+# This is the only place the build parameters are queried from the UI
+def readConfig():
+    return RigConfig(spineCount=cmds.intField(spineCount, query=True, value=True),
+                     fingerCount=cmds.intField(fingerCount, query=True, value=True),
+                     scale=cmds.floatField(rigScale, query=True, value=True))
+
+
+# Function to create all the OPM locators for the rig using the provided RigConfig
+# When no config is provided the values are read once from the fields made by createFields
+# backend is "cmds" or "api", see builders.getBuilder
+# namespace is prepended to every node name so several rigs can live in one scene, example: "hero:"
+def createLocators(config=None, backend="cmds", namespace=""):
+    for chainName in createLocatorSteps(config, backend, namespace):
+        pass
+
+
+# Same as createLocators but one chain at a time, the name of each chain is yielded once its locators
+# are made so a build can be spread over several idle events, see deferredBuild.py
+# Closing the generator before the end deletes the locators made so far
+def createLocatorSteps(config=None, backend="cmds", namespace=""):
+    if cmds.objExists(namespace + "opmStorage_GRP"):
+        print("The locator group already exists!")
+        return
+    else:
+        # Creates OPM storage group, kept in a local since other builds can run while this one is paused
+        prepareNamespace(namespace)
+        opmStorageGroup = cmds.group(empty=True, name=namespace + "opmStorage_GRP")
+
+    if config is None:
+        config = readConfig()
+    builder = builders.getBuilder(backend)
+    locatorRegistry = registry.NodeRegistry(namespace + "LOC_")
+    locatorRegistries[namespace] = locatorRegistry
+    
+    # The whole layout is computed up front and then applied chain by chain in one pass
+    # Each chain is a phase when profiling
+    try:
+        with profiler.phase("createLocators"):
+            rigLayout = layout.computeLayout(config, namespace)
+            for chain in rigLayout.chains:
+                with profiler.phase(chain.name):
+                    createChain(chain, rigLayout.chainPositions(chain), builder, locatorRegistry, opmStorageGroup)
+                yield chain.name
+
+            with profiler.phase("commit"):
+                builder.finish()
+                ownership.addOwnedNodes(namespace + ownership.LOCATOR_CONTAINER, [opmStorageGroup] + builder.createdNodes)
+    except GeneratorExit:
+        # Nodes queued by the api builder were never made, so only the nodes that exist are deleted
+        cmds.delete(cmds.ls([opmStorageGroup] + builder.createdNodes))
+        locatorRegistries.pop(namespace, None)
+        raise
+
+
+# Creates locators from saved names, positions and scales in one bulk pass, see rigFile.importRig
+# The names are saved without a namespace, namespace is prepended to them
+# Returns the number of locators made, 0 when the locator group already exists
+def loadLocators(names, positions, scales, backend="cmds", namespace=""):
+    if cmds.objExists(namespace + "opmStorage_GRP"):
+        print("The locator group already exists!")
+        return 0
+    prepareNamespace(namespace)
+    opmStorageGroup = cmds.group(empty=True, name=namespace + "opmStorage_GRP")
+
+    builder = builders.getBuilder(backend)
+    locatorRegistry = registry.NodeRegistry(namespace + "LOC_")
+    locatorRegistries[namespace] = locatorRegistry
+    with profiler.phase("loadLocators"):
+        for name, position, scale in zip(names, positions, scales):
+            locatorRegistry.addName(builder.createLocator(namespace + name, opmStorageGroup, position, scale))
+
+        with profiler.phase("commit"):
+            builder.finish()
+            ownership.addOwnedNodes(namespace + ownership.LOCATOR_CONTAINER, [opmStorageGroup] + builder.createdNodes)
+    return len(names)
+
+
+# Adds the locators of the config that are missing and removes the ones it no longer has
+# Locators that are already in the scene keep the positions they were moved to
+def updateLocators(config=None, backend="cmds", namespace=""):
+    if not cmds.objExists(namespace + "opmStorage_GRP"):
+        return createLocators(config, backend, namespace)
+
+    if config is None:
+        config = readConfig()
+    builder = builders.getBuilder(backend)
+    locatorRegistry = getRegistry(namespace)
+    unused = {(key, index) for key in locatorRegistry.chains for index in locatorRegistry.chains[key]}
+
+    with profiler.phase("updateLocators"):
+        rigLayout = layout.computeLayout(config, namespace)
+        for chain in rigLayout.chains:
+            positions = rigLayout.chainPositions(chain)
+            for i in range(len(chain)):
+                if (chain.key, i) in unused:
+                    unused.discard((chain.key, i))
+                else:
+                    locator = builder.createLocator(chain.locatorName(i), namespace + "opmStorage_GRP",
+                                                    positions[i], chain.scale)
+                    locatorRegistry.add(chain.key, i, locator)
+
+        with profiler.phase("commit"):
+            builder.finish()
+            ownership.addOwnedNodes(namespace + ownership.LOCATOR_CONTAINER, builder.createdNodes)
+
+    if unused:
+        cmds.delete(sorted(locatorRegistry.get(key, index) for key, index in unused))
+        for key, index in unused:
+            locatorRegistry.remove(key, index)
+
+
+# Creates the locators of a single chain at the provided positions directly under the opmStorage_GRP group
+# Example names: LOC_root, LOC_spine_1, LOC_L_arm_2, LOC_R_finger_3_0
+def createChain(chain, positions, builder, locatorRegistry, group):
+    for i, position in enumerate(positions):
+        locator = builder.createLocator(chain.locatorName(i), group, position, chain.scale)
+        locatorRegistry.add(chain.key, i, locator)
+
+
+# Returns the registry of the locators of a namespace
+# It is rebuilt from the scene in one pass when there is none yet or refresh is set, which the UI does
+# before every build in case locators were deleted, renamed or undone by hand
+def getRegistry(namespace="", refresh=False):
+    if refresh or namespace not in locatorRegistries:
+        locatorRegistries[namespace] = registry.fromScene(namespace + "opmStorage_GRP", namespace + "LOC_", "transform")
+    return locatorRegistries[namespace]
+
+
+# Creates the Maya namespace of a name prefix that ends with ":" if it does not exist yet
+# Plain prefixes such as "hero_" need nothing
+def prepareNamespace(namespace):
+    if not namespace.endswith(":"):
+        return
+    current = ""
+    for part in namespace[:-1].split(":"):
+        if part and not cmds.namespace(exists=":" + current + part):
+            cmds.namespace(addNamespace=part, parent=":" + current)
+        current += part + ":"
+
+
+# Function for mirroring user edits to locators from left to right (model's perspective)                
+# Left and right locators are paired by chain and segment index, not by their order in the scene
+# Right locators that are live mirrored already follow their partner and are skipped
+def mirrorLocators(namespace=""):
+    mirroredLocators = liveMirroredLocators(namespace)
+    for left, right in getRegistry(namespace).mirrorPairs():
+        if right in mirroredLocators:
+            continue
+        leftPosition = cmds.xform(left, query=True, translation=True, worldSpace=True)
+        cmds.move(-leftPosition[0], leftPosition[1], leftPosition[2], right)
+
+
+# Drives every right locator from its left partner with matrix nodes so edits are mirrored while
+# the left locators are moved, without any Python running. For each pair:
+#     LOC_L.worldMatrix * mirror matrix (scale -1 in X) * opmStorage_GRP.worldInverseMatrix
+#     -> pickMatrix (translation only) -> LOC_R.offsetParentMatrix
+# The right locator is zeroed so the offset parent matrix alone places it
+def createLiveMirror(namespace=""):
+    mirroredLocators = liveMirroredLocators(namespace)
+    mirrorNodes = []
+    for left, right in getRegistry(namespace).mirrorPairs():
+        if right in mirroredLocators:
+            continue
+
+        mirror = cmds.createNode("multMatrix", name=right + "_MIRROR")
+        cmds.connectAttr(left + ".worldMatrix", mirror + ".matrixIn[0]")
+        cmds.setAttr(mirror + ".matrixIn[1]", MIRROR_MATRIX, type="matrix")
+        cmds.connectAttr(namespace + "opmStorage_GRP.worldInverseMatrix", mirror + ".matrixIn[2]")
+
+        # Only the position is mirrored, the negative scale of the mirror matrix is dropped here
+        pick = cmds.createNode("pickMatrix", name=right + "_PICK")
+        cmds.setAttr(pick + ".useRotate", False)
+        cmds.setAttr(pick + ".useScale", False)
+        cmds.setAttr(pick + ".useShear", False)
+        cmds.connectAttr(mirror + ".matrixSum", pick + ".inputMatrix")
+        cmds.connectAttr(pick + ".outputMatrix", right + ".offsetParentMatrix", force=True)
+        cmds.setAttr(right + ".translate", 0, 0, 0)
+        mirrorNodes.extend([mirror, pick])
+
+    ownership.addOwnedNodes(namespace + ownership.LOCATOR_CONTAINER, mirrorNodes)
+
+
+# Breaks the live mirror and keeps the right locators where the mirror put them
+def bakeLiveMirror(namespace=""):
+    mirroredLocators = liveMirroredLocators(namespace)
+    for left, right in getRegistry(namespace).mirrorPairs():
+        if right not in mirroredLocators:
+            continue
+
+        # The mirrored position is found from the left locator so it does not depend on evaluation
+        leftPosition = cmds.xform(left, query=True, translation=True, worldSpace=True)
+        cmds.delete(right + "_MIRROR", right + "_PICK")
+        cmds.setAttr(right + ".offsetParentMatrix", IDENTITY_MATRIX, type="matrix")
+        cmds.move(-leftPosition[0], leftPosition[1], leftPosition[2], right)
+
+
+# Right locators that are currently driven by createLiveMirror
+def liveMirroredLocators(namespace=""):
+    pickNodes = cmds.ls([right + "_PICK" for left, right in getRegistry(namespace).mirrorPairs()])
+    return set(pickNode[:-len("_PICK")] for pickNode in pickNodes)
+        
+
+# Removes all locators from the scene together with the live mirror nodes
+# Everything the locator builds made is in one container, so this is a single delete
+# The group is deleted on its own for rigs built before the nodes were tracked, or when a failed build
+# never got to add its nodes to the container
+def deleteLocators(namespace=""):
+    ownership.deleteOwned(namespace + ownership.LOCATOR_CONTAINER)
+    if cmds.objExists(namespace + "opmStorage_GRP"):
+        cmds.delete(namespace + "opmStorage_GRP")
+    locatorRegistries.pop(namespace, None)
+
+
+# Finds the spine/finger counts of the locators currently in the scene
+# Used when building joints since the fields may have changed after the locators were made
+def configFromScene(namespace=""):
+    return getRegistry(namespace).config()
@@ -0,0 +1,492 @@
+# Pure Python stand-in for the part of maya.cmds used by RiggingBuddy
+#
+# Keeps an in-memory scene of nodes, parents, attributes and connections so the whole
+# createLocators -> createJoints pipeline runs without Maya, for example on CI machines.
+# Every command call is counted which gives a deterministic place to measure node counts,
+# command counts and build time for a config.
+#
+# Example:
+#     import offline
+#     cmds = offline.install()
+#     import locators, joints
+#     locators.createLocators(RigConfig(spineCount=6))
+#     joints.createJoints()
+#     print(cmds.scene.nodeCount("joint"), cmds.scene.calls)
+#
+# Positions are only translations, parent rotation and scale are not taken into account.
+# Matrix attributes are not evaluated, only their connections are stored.
+import argparse
+import fnmatch
+import re
+import sys
+import time
+import types
+from functools import wraps
+
+# Array attributes that connectAttr uses element 0 of when no index is given
+ARRAY_ATTRIBUTES = ("worldMatrix", "worldInverseMatrix", "parentMatrix", "parentInverseMatrix")
+
+# Modules that keep a reference to maya.cmds and are switched over by install()
+RIGGING_MODULES = ("registry", "ownership", "builders", "locators", "joints", "rigFile", "rigCache", "diagnostics", "evaluation", "deferredBuild", "undo", "batch", "riggingBuddy")
+
+
+# Counts every call of a command on the scene it is run on
+def command(function):
+    @wraps(function)
+    def wrapper(self, *args, **kwargs):
+        calls = self.scene.calls
+        calls[function.__name__] = calls.get(function.__name__, 0) + 1
+        return function(self, *args, **kwargs)
+    return wrapper
+
+
+# A DAG or DG node of the offline scene
+class Node():
+    def __init__(self, name, nodeType, parent=None):
+        self.name = name
+        self.type = nodeType
+        self.parent = parent
+        self.children = []
+        self.attributes = {}
+        if nodeType in Scene.dagTypes:
+            self.attributes["translate"] = [0.0, 0.0, 0.0]
+            self.attributes["scale"] = [1.0, 1.0, 1.0]
+        if parent is not None:
+            parent.children.append(self)
+
+
+    # Example: |opmStorage_GRP|LOC_root
+    def path(self):
+        if self.parent is None:
+            return "|" + self.name
+        return self.parent.path() + "|" + self.name
+
+
+# Nodes, connections and command counts of an offline scene
+class Scene():
+    dagTypes = ("transform", "joint", "locator")
+
+    def __init__(self):
+        self.nodes = {}
+        # Destination plug -> source plug, a destination can only have one source
+        self.connections = {}
+        self.calls = {}
+        # Full names of the Maya namespaces, example: ":hero"
+        self.namespaces = set()
+
+
+    # Finds a free name the way Maya does by adding or bumping a trailing number
+    def uniqueName(self, name):
+        if name not in self.nodes:
+            return name
+        stem = re.sub(r"\d+$", "", name)
+        i = 1
+        while stem + str(i) in self.nodes:
+            i += 1
+        return stem + str(i)
+
+
+    # Finds a node from a short name, full path, plug or the list returned by a command
+    def getNode(self, name):
+        if isinstance(name, (list, tuple)):
+            name = name[0]
+        shortName = str(name).split(".")[0].split("|")[-1]
+        if shortName not in self.nodes:
+            raise ValueError("No object matches name: " + str(name))
+        return self.nodes[shortName]
+
+
+    def nodeCount(self, nodeType=None):
+        if nodeType is None:
+            return len(self.nodes)
+        return len([node for node in self.nodes.values() if node.type == nodeType])
+
+
+    def worldPosition(self, node):
+        position = [0.0, 0.0, 0.0]
+        while node is not None:
+            translate = node.attributes.get("translate", (0.0, 0.0, 0.0))
+            position = [position[a] + translate[a] for a in range(3)]
+            node = node.parent
+        return position
+
+
+    def commandCount(self):
+        return sum(self.calls.values())
+
+
+    def clear(self):
+        self.nodes.clear()
+        self.connections.clear()
+        self.namespaces.clear()
+
+
+# Stand-in for the maya.cmds module
+class Cmds():
+    def __init__(self, scene=None):
+        self.scene = scene or Scene()
+
+
+    def _create(self, nodeType, name=None, parent=None):
+        parentNode = self.scene.getNode(parent) if parent else None
+        node = Node(self.scene.uniqueName(name or nodeType + "1"), nodeType, parentNode)
+        self.scene.nodes[node.name] = node
+        return node
+
+
+    # Flattens command arguments that may be names, lists of names or wildcard patterns
+    def _names(self, objects, patterns=False):
+        names = []
+        for obj in objects:
+            if isinstance(obj, (list, tuple)):
+                names.extend(self._names(obj, patterns))
+            elif patterns and "*" in obj:
+                matches = self.ls(obj)
+                if not matches:
+                    raise ValueError("No object matches name: " + obj)
+                names.extend(matches)
+            else:
+                names.append(self.scene.getNode(obj).name)
+        return names
+
+
+    # Example: node.worldMatrix -> node.worldMatrix[0]
+    def _plug(self, plug):
+        node, attribute = plug.split(".", 1)
+        if attribute in ARRAY_ATTRIBUTES:
+            attribute += "[0]"
+        return self.scene.getNode(node).name + "." + attribute
+
+
+    @command
+    def group(self, *objects, **kwargs):
+        group = self._create("transform", kwargs.get("name", "group1"), kwargs.get("parent"))
+        for name in self._names(objects):
+            self.parent(name, group.name)
+        return group.name
+
+
+    @command
+    def spaceLocator(self, name="locator1"):
+        transform = self._create("transform", name)
+        self._create("locator", transform.name + "Shape", transform.name)
+        return [transform.name]
+
+
+    @command
+    def createNode(self, nodeType, name=None, parent=None, skipSelect=False):
+        return self._create(nodeType, name, parent).name
+
+
+    @command
+    def rename(self, old, new):
+        node = self.scene.getNode(old)
+        new = self.scene.uniqueName(new)
+        del self.scene.nodes[node.name]
+        for destination, source in list(self.scene.connections.items()):
+            del self.scene.connections[destination]
+            destination = re.sub("^" + re.escape(node.name) + r"\.", new + ".", destination)
+            source = re.sub("^" + re.escape(node.name) + r"\.", new + ".", source)
+            self.scene.connections[destination] = source
+        node.name = new
+        self.scene.nodes[new] = node
+        return new
+
+
+    @command
+    def connectAttr(self, source, destination, force=False):
+        source = self._plug(source)
+        destination = self._plug(destination)
+        if destination in self.scene.connections and not force:
+            raise RuntimeError(destination + " is already connected")
+        self.scene.connections[destination] = source
+
+
+    @command
+    def disconnectAttr(self, source, destination):
+        destination = self._plug(destination)
+        if self.scene.connections.get(destination) == self._plug(source):
+            del self.scene.connections[destination]
+
+
+    @command
+    def parent(self, child, parent=None, world=False):
+        node = self.scene.getNode(child)
+        position = self.scene.worldPosition(node)
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.parent = None if world else self.scene.getNode(parent)
+        if node.parent is not None:
+            node.parent.children.append(node)
+
+        # Keeps the world position like cmds.parent does
+        parentPosition = self.scene.worldPosition(node.parent)
+        node.attributes["translate"] = [position[a] - parentPosition[a] for a in range(3)]
+        return [node.name]
+
+
+    # Absolute world space move
+    @command
+    def move(self, x, y, z, *objects, **kwargs):
+        for name in self._names(objects):
+            node = self.scene.getNode(name)
+            parentPosition = self.scene.worldPosition(node.parent)
+            node.attributes["translate"] = [x - parentPosition[0], y - parentPosition[1], z - parentPosition[2]]
+
+
+    @command
+    def scale(self, x, y, z, *objects, **kwargs):
+        for name in self._names(objects):
+            self.scene.getNode(name).attributes["scale"] = [x, y, z]
+
+
+    @command
+    def xform(self, obj, query=False, translation=None, scale=None, worldSpace=False, **kwargs):
+        node = self.scene.getNode(obj)
+        if query:
+            if worldSpace:
+                return self.scene.worldPosition(node)
+            return list(node.attributes["translate"])
+        if translation is not None:
+            parentPosition = self.scene.worldPosition(node.parent) if worldSpace else [0.0, 0.0, 0.0]
+            node.attributes["translate"] = [translation[a] - parentPosition[a] for a in range(3)]
+        if scale is not None:
+            node.attributes["scale"] = list(scale)
+
+
+    @command
+    def getAttr(self, plug):
+        node, attribute = plug.split(".", 1)
+        value = self.scene.getNode(node).attributes.get(attribute)
+        # Compound attributes come back as a list with one tuple like Maya
+        if isinstance(value, list):
+            return [tuple(value)]
+        return value
+
+
+    @command
+    def setAttr(self, plug, *values, **kwargs):
+        node, attribute = plug.split(".", 1)
+        self.scene.getNode(node).attributes[attribute] = list(values) if len(values) > 1 else values[0]
+
+
+    @command
+    def objExists(self, name):
+        try:
+            self.scene.getNode(name)
+        except ValueError:
+            return False
+        return True
+
+
+    @command
+    def nodeType(self, name):
+        return self.scene.getNode(name).type
+
+
+    # Results are sorted by name which is the order the wildcard lookups of the tool rely on
+    @command
+    def ls(self, *patterns, **kwargs):
+        nodeTypes = kwargs.get("type")
+        if isinstance(nodeTypes, str):
+            nodeTypes = [nodeTypes]
+        names = []
+        for name in sorted(self.scene.nodes):
+            node = self.scene.nodes[name]
+            if nodeTypes and node.type not in nodeTypes:
+                continue
+            if patterns and not any(fnmatch.fnmatchcase(name, pattern) for pattern in self._flatten(patterns)):
+                continue
+            names.append(node.path() if kwargs.get("long") else name)
+        return names
+
+
+    def _flatten(self, patterns):
+        flat = []
+        for pattern in patterns:
+            if isinstance(pattern, (list, tuple)):
+                flat.extend(pattern)
+            else:
+                flat.append(pattern)
+        return flat
+
+
+    @command
+    def listRelatives(self, *objects, **kwargs):
+        found = []
+        for name in self._names(objects):
+            node = self.scene.getNode(name)
+            if kwargs.get("parent"):
+                relatives = [node.parent] if node.parent is not None else []
+            elif kwargs.get("allDescendents"):
+                relatives = self._descendants(node)
+            else:
+                relatives = list(node.children)
+
+            for relative in relatives:
+                if kwargs.get("type") and relative.type != kwargs["type"]:
+                    continue
+                found.append(relative.path() if kwargs.get("fullPath") else relative.name)
+        # Maya returns None instead of an empty list
+        return found or None
+
+
+    def _descendants(self, node):
+        found = []
+        for child in node.children:
+            found.append(child)
+            found.extend(self._descendants(child))
+        return found
+
+
+    # With connections the plug of obj comes before each connected plug or node, like in Maya
+    @command
+    def listConnections(self, obj, source=True, destination=True, plugs=False, connections=False):
+        if "." in obj:
+            matches = lambda plug: plug == self._plug(obj)
+        else:
+            name = self.scene.getNode(obj).name
+            matches = lambda plug: plug.split(".")[0] == name
+
+        found = []
+        for dst, src in self.scene.connections.items():
+            for own, other, wanted in ((dst, src, source), (src, dst, destination)):
+                if wanted and matches(own):
+                    if connections:
+                        found.append(own)
+                    found.append(other if plugs else other.split(".")[0])
+        return found or None
+
+
+    # Deletes nodes, their DAG children and every connection to them
+    @command
+    def delete(self, *objects):
+        for name in self._names(objects, patterns=True):
+            if name in self.scene.nodes:
+                self._delete(self.scene.nodes[name])
+
+
+    def _delete(self, node):
+        # Deleting a container deletes the nodes in it like in Maya
+        if node.type == "container":
+            for member in node.attributes.get("nodeList", []):
+                if member in self.scene.nodes and member != node.name:
+                    self._delete(self.scene.nodes[member])
+            if node.name not in self.scene.nodes:
+                return
+        for child in list(node.children):
+            self._delete(child)
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        del self.scene.nodes[node.name]
+        for destination, source in list(self.scene.connections.items()):
+            if destination.split(".")[0] == node.name or source.split(".")[0] == node.name:
+                del self.scene.connections[destination]
+
+
+    # Containers only keep their list of member nodes
+    @command
+    def container(self, target=None, name=None, edit=False, query=False, addNode=None, nodeList=False, force=False):
+        if not edit and not query:
+            target = self._create("container", name or "container1").name
+            if addNode is None:
+                return target
+
+        members = self.scene.getNode(target).attributes.setdefault("nodeList", [])
+        if query:
+            return [member for member in members if member in self.scene.nodes] or None
+        for member in self._names(addNode or []):
+            if member not in members:
+                members.append(member)
+        if not edit:
+            return target
+
+
+    @command
+    def namespace(self, exists=None, addNamespace=None, parent=":"):
+        if exists is not None:
+            return (":" + exists.lstrip(":")) in self.scene.namespaces
+        if addNamespace is not None:
+            name = parent.rstrip(":") + ":" + addNamespace
+            self.scene.namespaces.add(name)
+            return name.lstrip(":")
+
+
+    # Undo is not recorded offline, queries report an enabled undo queue
+    @command
+    def undoInfo(self, query=False, **kwargs):
+        if query:
+            return True
+
+
+    @command
+    def flushUndo(self):
+        pass
+
+
+    @command
+    def file(self, *args, **kwargs):
+        if kwargs.get("new"):
+            self.scene.clear()
+
+
+    @command
+    def about(self, batch=False, **kwargs):
+        return True
+
+
+# Puts a Cmds object in place of maya.cmds so the RiggingBuddy modules can be imported without Maya
+# Modules that were already imported are switched over to the offline commands too
+def install(cmds=None):
+    cmds = cmds or Cmds()
+    maya = types.ModuleType("maya")
+    maya.cmds = cmds
+    sys.modules["maya"] = maya
+    sys.modules["maya.cmds"] = cmds
+
+    for name in RIGGING_MODULES:
+        module = sys.modules.get(name)
+        if module is not None and hasattr(module, "cmds"):
+            module.cmds = cmds
+    # The locator registries belong to the previous scene
+    if "locators" in sys.modules:
+        sys.modules["locators"].locatorRegistries.clear()
+    return cmds
+
+
+# Builds the locators and joints for a config offline and returns the counts and time taken
+def measureBuild(rigConfig, backend="cmds"):
+    cmds = install()
+    import locators
+    import joints
+
+    start = time.perf_counter()
+    locators.createLocators(rigConfig, backend=backend)
+    joints.createJoints(rigConfig, backend=backend)
+    seconds = time.perf_counter() - start
+
+    nodeTypes = sorted(set(node.type for node in cmds.scene.nodes.values()))
+    return {"config": rigConfig.toDict(),
+            "seconds": seconds,
+            "nodes": {nodeType: cmds.scene.nodeCount(nodeType) for nodeType in nodeTypes},
+            "commands": dict(cmds.scene.calls),
+            "connections": len(cmds.scene.connections)}
+
+
+def main(argv=None):
+    from config import RigConfig
+
+    parser = argparse.ArgumentParser(description="Build a RiggingBuddy rig without Maya")
+    parser.add_argument("--spine", type=int, default=4, help="spine count")
+    parser.add_argument("--finger", type=int, default=5, help="finger count")
+    args = parser.parse_args(argv)
+
+    result = measureBuild(RigConfig(spineCount=args.spine, fingerCount=args.finger))
+    print("Built in " + str(round(result["seconds"] * 1000, 3)) + " ms")
+    print("Nodes: " + str(result["nodes"]))
+    print("Commands: " + str(result["commands"]))
+    print("Connections: " + str(result["connections"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import maya.cmds as cmds
+
+# Tracks every node a build creates so a rig can be deleted exactly, without wildcard searches
+#
+# Each part of a rig has a container node that the builds add their nodes to:
+#     opmStorage_CONT - opmStorage_GRP, the locators and the live mirror nodes
+#     JNT_CONT        - JNT_GRP, the joints and their _REST, _AIM and _MULT nodes
+# Deleting a container deletes every node in it, so removing a rig is a single delete call and the
+# unnamed utility nodes of the matrix network can no longer be left behind in the scene.
+
+LOCATOR_CONTAINER = "opmStorage_CONT"
+JOINT_CONTAINER = "JNT_CONT"
+
+
+# Adds nodes to a container, the container is made the first time something is added to it
+# A new container is made together with its nodes in one command, so a failed add never leaves an empty
+# container behind that deleteOwned would take for the whole rig
+def addOwnedNodes(container, nodes):
+    if not nodes:
+        return
+    if not cmds.objExists(container):
+        cmds.container(name=container, addNode=list(nodes), force=True)
+        return
+    cmds.container(container, edit=True, addNode=list(nodes), force=True)
+
+
+# Nodes in a container, empty if the container does not exist
+def ownedNodes(container):
+    if not cmds.objExists(container):
+        return []
+    return cmds.container(container, query=True, nodeList=True) or []
+
+
+# Deletes a container together with every node in it
+# Returns False when there was no container, for rigs built before nodes were tracked
+def deleteOwned(container):
+    if not cmds.objExists(container):
+        return False
+    cmds.delete(container)
+    return True
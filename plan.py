@@ -0,0 +1,173 @@
+import hashlib
+import json
+import templates
+
+# Build plans: the node network of a build worked out in Python before the scene is touched
+#
+# A BuildPlan is the list of nodes to create as (node type, name, parent) in creation order and the
+# connections between them as (source, source attribute, destination, destination attribute).
+# Plans are made from the calls of a RecordingBuilder, so a plan holds exactly what the build makes,
+# and are never changed once made which lets the same plan be cached and executed any number of times.
+#
+# Example:
+#     jointPlan = joints.planJoints(RigConfig(spineCount=6))
+#     jointPlan.validate(existing=["opmStorage_GRP", "LOC_root", ...])   -> [] when the plan can be built
+#     jointPlan.diff(joints.planJoints(RigConfig(spineCount=7)))         -> added and removed nodes/connections
+#     jointPlan.execute(builders.getBuilder("api"))
+
+
+class BuildPlan():
+    def __init__(self, nodes, connections):
+        self.nodes = tuple(nodes)
+        self.connections = tuple(connections)
+
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+    def __eq__(self, other):
+        return isinstance(other, BuildPlan) and self.nodes == other.nodes and self.connections == other.connections
+
+
+    # Names of the planned nodes in creation order
+    def names(self):
+        return tuple(node[1] for node in self.nodes)
+
+
+    # (name, parent) of every planned node that is created under a parent
+    def parents(self):
+        return tuple((name, parent) for nodeType, name, parent in self.nodes if parent)
+
+
+    # Nodes the plan reads from or creates nodes under without making them, such as the locators
+    def inputs(self):
+        names = set(self.names())
+        inputs = set(parent for name, parent in self.parents() if parent not in names)
+        inputs.update(connection[0] for connection in self.connections if connection[0] not in names)
+        inputs.update(connection[2] for connection in self.connections if connection[2] not in names)
+        return sorted(inputs)
+
+
+    # Returns a list of the problems that would stop the plan from building, empty when there are none:
+    # names used twice, parents created after their children, destination plugs connected twice, cycles
+    # and, when the names of the existing nodes are given, inputs that are not in the scene
+    def validate(self, existing=None):
+        problems = []
+        names = set(self.names())
+        created = set()
+        for nodeType, name, parent in self.nodes:
+            if name in created:
+                problems.append("Node is created twice: " + name)
+            if parent and parent in names and parent not in created:
+                problems.append("Parent is created after its child: " + name + " under " + parent)
+            created.add(name)
+
+        destinations = set()
+        for source, sourceAttr, destination, destinationAttr in self.connections:
+            plug = destination + "." + destinationAttr
+            if plug in destinations:
+                problems.append("Plug is connected twice: " + plug)
+            destinations.add(plug)
+
+        problems.extend("Cycle: " + " -> ".join(cycle) for cycle in self.cycles())
+
+        if existing is not None:
+            existing = set(existing)
+            problems.extend("Missing input: " + node for node in self.inputs() if node not in existing)
+        return problems
+
+
+    # Loops in the connections between nodes, each one as the list of its nodes
+    # The parents count as connections too, a joint passes its world matrix on to its children
+    def cycles(self):
+        outputs = {}
+        for source, sourceAttr, destination, destinationAttr in self.connections:
+            outputs.setdefault(source, set()).add(destination)
+        for name, parent in self.parents():
+            outputs.setdefault(parent, set()).add(name)
+
+        # Depth first search without recursion so long chains do not hit the recursion limit
+        cycles = []
+        state = {}
+        for start in sorted(outputs):
+            if start in state:
+                continue
+            path = [start]
+            stack = [iter(sorted(outputs[start]))]
+            state[start] = "open"
+            while stack:
+                node = next(stack[-1], None)
+                if node is None:
+                    state[path.pop()] = "done"
+                    stack.pop()
+                elif state.get(node) == "open":
+                    cycles.append(path[path.index(node):] + [node])
+                elif node not in state:
+                    state[node] = "open"
+                    path.append(node)
+                    stack.append(iter(sorted(outputs.get(node, ()))))
+        return cycles
+
+
+    # What changes from this plan to another one, as sorted lists of nodes and connections
+    def diff(self, other):
+        nodes, otherNodes = set(self.nodes), set(other.nodes)
+        connections, otherConnections = set(self.connections), set(other.connections)
+        return {"addedNodes": sorted(otherNodes - nodes, key=str),
+                "removedNodes": sorted(nodes - otherNodes, key=str),
+                "addedConnections": sorted(otherConnections - connections),
+                "removedConnections": sorted(connections - otherConnections)}
+
+
+    # Plan of only the given nodes and the connections into them, the other nodes become inputs
+    def subset(self, names):
+        names = set(names)
+        return BuildPlan([node for node in self.nodes if node[1] in names],
+                         [connection for connection in self.connections if connection[2] in names])
+
+
+    # Same as subset for several groups of names in one pass, returns a plan per group in the same order
+    def split(self, groups):
+        groupIndices = {}
+        for i, names in enumerate(groups):
+            for name in names:
+                groupIndices[name] = i
+        nodes = [[] for names in groups]
+        connections = [[] for names in groups]
+        for node in self.nodes:
+            if node[1] in groupIndices:
+                nodes[groupIndices[node[1]]].append(node)
+        for connection in self.connections:
+            if connection[2] in groupIndices:
+                connections[groupIndices[connection[2]]].append(connection)
+        return [BuildPlan(groupNodes, groupConnections) for groupNodes, groupConnections in zip(nodes, connections)]
+
+
+    # Makes every node and then every connection of the plan on a builder, finish() is left to the caller
+    def execute(self, builder):
+        for nodeType, name, parent in self.nodes:
+            builder.createNode(nodeType, name, parent)
+        for connection in self.connections:
+            builder.connect(*connection)
+
+
+# Makes the plan of the calls recorded by a RecordingBuilder
+def fromRecording(recording):
+    nodes = []
+    connections = []
+    for method, arguments, nameIndices in recording.calls:
+        if method == "createNode":
+            nodes.append(tuple(arguments))
+        elif method == "connect":
+            connections.append(tuple(arguments))
+        else:
+            raise ValueError("Cannot plan a " + method + " call")
+    return BuildPlan(nodes, connections)
+
+
+# Hash of everything that decides a plan: the config, the skeleton template and any build options
+# Example: configHash(RigConfig(spineCount=6), namespace="hero:", lean=True)
+def configHash(config, **options):
+    data = json.dumps([config.toDict(), templates.SKELETON, options], sort_keys=True, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
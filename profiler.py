@@ -0,0 +1,180 @@
+# Opt-in profiling of every maya.cmds call made by the build
+#
+# While profiling, the cmds module used by builders.py, locators.py and joints.py is swapped for a wrapper
+# that counts and times every command. The builds mark their phases (one per skeleton chain:
+# spine, head, jaw, eye, leg, arm, finger...) so time is also reported per phase, and the
+# nested phase/command timings can be written as folded stacks for flame graph tools
+# (flamegraph.pl, speedscope).
+#
+# Example:
+#     with profiler.profile() as result:
+#         locators.createLocators(rigConfig)
+#         joints.createJoints(rigConfig)
+#     result.report()
+#     result.writeFolded("build.folded")
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+
+# Modules whose cmds reference is wrapped while profiling
+PROFILED_MODULES = ("registry", "ownership", "builders", "locators", "joints")
+
+# Profiler that is currently recording, None when profiling is off
+activeProfiler = None
+
+
+# Timings collected while profiling
+class Profiler():
+    def __init__(self):
+        # Command name -> number of calls and cumulative seconds
+        self.calls = {}
+        self.commandTimes = {}
+        # Phase name -> cumulative seconds including the commands run inside it
+        self.phaseTimes = {}
+        # "phase;phase;command" -> seconds spent in that frame itself, used for flame graphs
+        self.folded = {}
+        # Open phases as [name, start time, seconds spent in children]
+        self.stack = []
+
+
+    def _addFolded(self, frames, seconds):
+        key = ";".join(frames)
+        self.folded[key] = self.folded.get(key, 0.0) + seconds
+        if self.stack:
+            self.stack[-1][2] += seconds
+
+
+    def recordCommand(self, name, seconds):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.commandTimes[name] = self.commandTimes.get(name, 0.0) + seconds
+        self._addFolded([frame[0] for frame in self.stack] + [name], seconds)
+
+
+    def pushPhase(self, name):
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+
+    def popPhase(self):
+        name, start, childSeconds = self.stack[-1]
+        seconds = time.perf_counter() - start
+        self.phaseTimes[name] = self.phaseTimes.get(name, 0.0) + seconds
+        # Only the time not spent in commands or nested phases belongs to the phase frame itself
+        frames = [frame[0] for frame in self.stack]
+        self.stack.pop()
+        self.folded[";".join(frames)] = self.folded.get(";".join(frames), 0.0) + seconds - childSeconds
+        if self.stack:
+            self.stack[-1][2] += seconds
+
+
+    def report(self):
+        print("Command                  Calls     Total ms")
+        for name in sorted(self.commandTimes, key=self.commandTimes.get, reverse=True):
+            milliseconds = round(self.commandTimes[name] * 1000, 3)
+            print(name.ljust(24) + str(self.calls[name]).rjust(6) + str(milliseconds).rjust(13))
+        print("")
+        print("Phase                             Total ms")
+        for name in sorted(self.phaseTimes, key=self.phaseTimes.get, reverse=True):
+            print(name.ljust(24) + str(round(self.phaseTimes[name] * 1000, 3)).rjust(19))
+
+
+    # Writes "frame;frame;frame microseconds" lines, the folded stack format used by flame graph tools
+    def writeFolded(self, path):
+        with open(path, "w") as foldedFile:
+            for frames in sorted(self.folded):
+                foldedFile.write(frames + " " + str(int(round(self.folded[frames] * 1000000))) + "\n")
+
+
+# Stand-in for the cmds module that times every command through a Profiler
+class ProfiledCmds():
+    def __init__(self, cmds, profiler):
+        self._cmds = cmds
+        self._profiler = profiler
+
+
+    def __getattr__(self, name):
+        function = getattr(self._cmds, name)
+        if not callable(function):
+            return function
+
+        def profiled(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._profiler.recordCommand(name, time.perf_counter() - start)
+        return profiled
+
+
+# Marks a phase of the build. Does nothing unless a profiler is recording
+@contextmanager
+def phase(name):
+    profiler = activeProfiler
+    if profiler is None:
+        yield
+        return
+
+    profiler.pushPhase(name)
+    try:
+        yield
+    finally:
+        profiler.popPhase()
+
+
+# Profiles everything run inside the with block and yields the Profiler with the results
+@contextmanager
+def profile(modules=PROFILED_MODULES):
+    global activeProfiler
+
+    profiler = Profiler()
+    wrapped = []
+    for name in modules:
+        module = sys.modules.get(name)
+        if module is not None and hasattr(module, "cmds"):
+            wrapped.append((module, module.cmds))
+            module.cmds = ProfiledCmds(module.cmds, profiler)
+
+    previous = activeProfiler
+    activeProfiler = profiler
+    try:
+        yield profiler
+    finally:
+        activeProfiler = previous
+        for module, cmds in wrapped:
+            module.cmds = cmds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the cmds calls of a RiggingBuddy build")
+    parser.add_argument("--spine", type=int, default=4, help="spine count")
+    parser.add_argument("--finger", type=int, default=5, help="finger count")
+    parser.add_argument("--backend", default="cmds", help="build backend, cmds or api")
+    parser.add_argument("--maya", action="store_true", help="run in Maya standalone instead of offline")
+    parser.add_argument("--folded", help="file to write the folded stacks to")
+    args = parser.parse_args(argv)
+
+    if args.maya:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+    else:
+        import offline
+        offline.install()
+
+    import locators
+    import joints
+    from config import RigConfig
+    # The builds mark their phases on the imported module, not on this script when it is run directly
+    import profiler
+
+    rigConfig = RigConfig(spineCount=args.spine, fingerCount=args.finger)
+    with profiler.profile() as result:
+        locators.createLocators(rigConfig, backend=args.backend)
+        joints.createJoints(rigConfig, backend=args.backend)
+
+    result.report()
+    if args.folded:
+        result.writeFolded(args.folded)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import maya.cmds as cmds
+import templates
+from config import RigConfig
+
+# Index of the nodes of a rig by chain key and segment index
+#
+# The builds look their locators up here instead of searching the scene with wildcard cmds.ls calls.
+# A registry is filled in while the locators are created, or rebuilt from the scene with a single
+# listRelatives call and by parsing the node names (LOC_root, LOC_spine_1, LOC_L_finger_3_0...)
+# The same works for the joints with the JNT_ prefix
+#
+# Example:
+#     locatorRegistry = registry.fromScene("opmStorage_GRP", "LOC_", "transform")
+#     locatorRegistry.get("L_arm", 2)    -> "LOC_L_arm_2"
+#     locatorRegistry.config()           -> RigConfig with the spine and finger counts of the scene
+
+
+class NodeRegistry():
+    def __init__(self, prefix="LOC_"):
+        self.prefix = prefix
+        # Chain key -> {segment index: node name}
+        self.chains = {}
+
+
+    def __len__(self):
+        return sum(len(segments) for segments in self.chains.values())
+
+
+    def add(self, key, index, node):
+        self.chains.setdefault(key, {})[index] = node
+
+
+    # Adds a node by its name, names that do not follow <prefix><key>_<index> are ignored
+    def addName(self, name):
+        parsed = self.parseName(name)
+        if parsed is not None:
+            self.add(parsed[0], parsed[1], name)
+
+
+    # Splits a node name into its chain key and segment index, None if it is not a segment name
+    def parseName(self, name):
+        if not name.startswith(self.prefix):
+            return None
+        body = name[len(self.prefix):]
+        if body == "root":
+            return "root", 0
+        key, _, index = body.rpartition("_")
+        if not key or not index.isdigit():
+            return None
+        return key, int(index)
+
+
+    def get(self, key, index):
+        return self.chains[key][index]
+
+
+    # Same as get but returns None for segments that are not in the registry
+    def find(self, key, index):
+        return self.chains.get(key, {}).get(index)
+
+
+    def remove(self, key, index):
+        segments = self.chains.get(key, {})
+        segments.pop(index, None)
+        if not segments:
+            self.chains.pop(key, None)
+
+
+    # Every node in the registry ordered by chain key and then segment index as a number,
+    # so LOC_spine_10 comes after LOC_spine_9 and not after LOC_spine_1 like it does with cmds.ls
+    def names(self):
+        return [node for key in sorted(self.chains) for node in self.chainNodes(key)]
+
+
+    # Nodes of a chain in segment order
+    def chainNodes(self, key):
+        segments = self.chains.get(key, {})
+        return [segments[index] for index in sorted(segments)]
+
+
+    # Pairs every left segment with the right segment of the same chain key and index
+    # Returns (left node, right node) tuples, segments without a partner are left out
+    def mirrorPairs(self):
+        pairs = []
+        for key in sorted(self.chains):
+            if not key.startswith("L_"):
+                continue
+            partner = self.chains.get("R_" + key[2:], {})
+            for index in sorted(self.chains[key]):
+                if index in partner:
+                    pairs.append((self.chains[key][index], partner[index]))
+        return pairs
+
+
+    # Finds the spine/finger counts of the registered nodes from the amount of segments and chain copies
+    def config(self):
+        config = RigConfig()
+        for entry in templates.SKELETON:
+            key = entry["name"] if entry["side"] is None else entry["side"] + "_" + entry["name"]
+            if "repeat" in entry:
+                self._setCount(config, entry["repeat"], self._copyCount(key))
+                key += "_0"
+            if "count" in entry:
+                self._setCount(config, entry["count"], len(self.chains.get(key, ())))
+        return config
+
+
+    def _copyCount(self, key):
+        count = 0
+        while key + "_" + str(count) in self.chains:
+            count += 1
+        return count
+
+
+    def _setCount(self, config, name, count):
+        if hasattr(config, name):
+            setattr(config, name, count)
+        else:
+            config.counts[name] = count
+
+
+# Builds a registry of the nodes under a node in one pass, the node itself is added too if it is a segment
+# Example: the locators are the transforms under opmStorage_GRP and the joints are JNT_root and every joint below it
+def fromScene(root, prefix="LOC_", nodeType="transform", allDescendents=False):
+    nodeRegistry = NodeRegistry(prefix)
+    if not cmds.objExists(root):
+        return nodeRegistry
+
+    if allDescendents:
+        names = cmds.listRelatives(root, allDescendents=True, type=nodeType) or []
+    else:
+        names = cmds.listRelatives(root, children=True, type=nodeType) or []
+    for name in [root] + names:
+        nodeRegistry.addName(name)
+    return nodeRegistry
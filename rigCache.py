@@ -0,0 +1,146 @@
+# On-disk cache of built rigs
+#
+# The same body configurations are rebuilt many times a day. buildRig() saves every rig it builds as a
+# rig template (see rigFile.py) named after the hash of the build, and a later build of the same config
+# is a single template import: the locators are loaded in one bulk pass and the joints are replayed from
+# the saved graph, nothing is laid out or planned again.
+#
+# The hash covers the config, the skeleton template and the build options, which together decide every
+# locator position, so changing any of them is a new cache entry. Entries over MAX_ENTRIES or MAX_BYTES
+# are evicted least recently used first, a cache hit touches its file so the modification time is the
+# time it was last used. The cache folder is RIGGINGBUDDY_CACHE or ~/.riggingBuddy/cache
+#
+# Example:
+#     rigCache.buildRig(RigConfig(spineCount=6, fingerCount=3))   -> False, built and cached
+#     rigCache.buildRig(RigConfig(spineCount=6, fingerCount=3))   -> True, imported from the cache
+import os
+import tempfile
+import time
+import maya.cmds as cmds
+import locators
+import joints
+import plan
+import profiler
+import rigFile
+
+MAX_ENTRIES = 64
+MAX_BYTES = 50 * 1024 * 1024
+
+# Version of the cached files, bumping it leaves the old entries to be evicted
+CACHE_VERSION = 1
+
+# Suffix of the files that are still being written, they are never cache entries
+TEMPORARY_SUFFIX = ".tmp"
+
+# Temporary files older than this were left by a session that crashed while writing and are deleted by evict
+STALE_SECONDS = 60 * 60
+
+
+def cacheDirectory():
+    return os.environ.get("RIGGINGBUDDY_CACHE") or os.path.join(os.path.expanduser("~"), ".riggingBuddy", "cache")
+
+
+def cachePath(config, lean=False, directory=None):
+    key = plan.configHash(config, lean=lean, version=CACHE_VERSION)
+    return os.path.join(directory or cacheDirectory(), key + ".rbt")
+
+
+# Builds the locators and joints of a config, from the cache when it has been built before
+# Returns True for a cache hit, False when the rig was built and added to the cache and None when the
+# namespace already has a rig or the joints could not be built. Only a rig built fresh from the config
+# is stored, a rig already in the scene may have moved locators and would be cached under the wrong config
+def buildRig(config, backend="cmds", namespace="", lean=False, directory=None):
+    for group in ("opmStorage_GRP", "JNT_GRP"):
+        if cmds.objExists(namespace + group):
+            print("The " + namespace + group + " group already exists!")
+            return None
+
+    path = cachePath(config, lean, directory)
+    if os.path.exists(path):
+        with profiler.phase("cacheHit"):
+            os.utime(path, None)
+            rigFile.importRig(path, backend, buildJoints=True, namespace=namespace)
+        return True
+
+    locators.createLocators(config, backend=backend, namespace=namespace)
+    if not joints.createJoints(config, backend=backend, namespace=namespace, lean=lean):
+        return None
+    with profiler.phase("cacheStore"):
+        storeRig(path, config, namespace, lean)
+        evict(directory)
+    return False
+
+
+# Saves the rig of a namespace to the cache, written to a temporary file first so a Maya session
+# that reads the cache at the same time never sees half a file. The temporary file is not a cache
+# entry, so an evict in another session cannot delete it while it is written
+def storeRig(path, config, namespace="", lean=False):
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    handle, temporaryPath = tempfile.mkstemp(suffix=TEMPORARY_SUFFIX, dir=directory)
+    os.close(handle)
+    try:
+        rigFile.exportRig(temporaryPath, config, namespace, lean)
+        os.replace(temporaryPath, path)
+    except Exception:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+        raise
+
+
+# Deletes the least recently used entries until the cache fits in maxEntries files and maxBytes
+# Returns the number of entries deleted
+def evict(directory=None, maxEntries=MAX_ENTRIES, maxBytes=MAX_BYTES):
+    removeStaleFiles(directory)
+    entries = []
+    for entry in cacheEntries(directory):
+        try:
+            entries.append((os.path.getmtime(entry), os.path.getsize(entry), entry))
+        except OSError:
+            # Evicted by another session in the meantime
+            continue
+
+    deleted = 0
+    total = 0
+    kept = 0
+    for modified, size, entry in sorted(entries, reverse=True):
+        if kept < maxEntries and total + size <= maxBytes:
+            kept += 1
+            total += size
+            continue
+        try:
+            os.remove(entry)
+            deleted += 1
+        except OSError:
+            pass
+    return deleted
+
+
+def cacheEntries(directory=None):
+    directory = directory or cacheDirectory()
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".rbt")]
+
+
+# Deletes the temporary files of writes that never finished
+def removeStaleFiles(directory=None):
+    directory = directory or cacheDirectory()
+    if not os.path.isdir(directory):
+        return
+    now = time.time()
+    for name in os.listdir(directory):
+        if not name.endswith(TEMPORARY_SUFFIX):
+            continue
+        try:
+            if now - os.path.getmtime(os.path.join(directory, name)) > STALE_SECONDS:
+                os.remove(os.path.join(directory, name))
+        except OSError:
+            # Finished or deleted by another session in the meantime
+            pass
+
+
+# Deletes every entry of the cache and returns how many there were
+def clearCache(directory=None):
+    return evict(directory, maxEntries=0, maxBytes=0)
@@ -0,0 +1,107 @@
+# Saving and loading tuned locator layouts as rig templates
+#
+# A template holds the config, every locator under opmStorage_GRP (name, position and scale) and the
+# expected joint graph as recorded builder calls, so a library of body templates can be loaded in one
+# bulk pass instead of opening a Maya scene for each of them.
+#
+# Files ending in .json are plain JSON. Anything else is the compact binary format:
+#     MAGIC, uint32 length of the zlib compressed JSON of everything but the positions,
+#     that compressed JSON and then the positions as little endian float32 (x, y, z per locator)
+#
+# Example:
+#     rigFile.exportRig("library/hero.rbt")
+#     rigFile.importRig("library/hero.rbt", buildJoints=True)
+import json
+import struct
+import zlib
+import maya.cmds as cmds
+import builders
+import joints
+import locators
+from config import RigConfig
+
+MAGIC = b"RBT1"
+VERSION = 1
+
+
+# Saves the locators in the scene as a template and returns the template dictionary
+# The counts are always found from the locators, config only provides the scale and proportions to keep
+# Names are saved without the namespace so a template can be loaded into any namespace
+# lean saves the joint graph of the lean network, see joints.createChainJoints
+def exportRig(path, config=None, namespace="", lean=False):
+    locatorRegistry = locators.getRegistry(namespace, refresh=True)
+    rigConfig = locatorRegistry.config()
+    if config is not None:
+        rigConfig.scale = config.scale
+        rigConfig.proportions = dict(config.proportions)
+
+    names = locatorRegistry.names()
+    positions = []
+    scales = []
+    for name in names:
+        positions.append([float(value) for value in cmds.xform(name, query=True, translation=True, worldSpace=True)])
+        scales.append(float(cmds.getAttr(name + ".scale")[0][0]))
+
+    def removeNamespace(name):
+        return name[len(namespace):] if name.startswith(namespace) else name
+
+    jointCalls = builders.RecordingBuilder()
+    joints.recordJoints(rigConfig, locatorRegistry, namespace, lean).replay(jointCalls, removeNamespace)
+    template = {"version": VERSION,
+                "config": rigConfig.toDict(),
+                "names": [removeNamespace(name) for name in names],
+                "positions": positions,
+                "scales": scales,
+                "joints": jointCalls.toData()}
+    writeTemplate(path, template)
+    return template
+
+
+# Creates the locators of a template, and its joints from the saved joint graph when buildJoints is set
+# Returns the RigConfig of the template, or None when nothing was imported because the namespace already
+# has a rig, the joints would be replayed onto locators that are not the ones of the template
+def importRig(path, backend="cmds", buildJoints=False, namespace=""):
+    template = readTemplate(path)
+    if buildJoints and cmds.objExists(namespace + "JNT_GRP"):
+        print("The joint group already exists!")
+        return None
+    if not locators.loadLocators(template["names"], template["positions"], template["scales"], backend, namespace):
+        return None
+    if buildJoints:
+        joints.replayJoints(builders.RecordingBuilder.fromData(template["joints"]), backend, namespace)
+    return RigConfig.fromDict(template["config"])
+
+
+def writeTemplate(path, template):
+    if path.endswith(".json"):
+        with open(path, "w") as templateFile:
+            json.dump(template, templateFile)
+        return
+
+    header = dict(template)
+    positions = header.pop("positions")
+    compressed = zlib.compress(json.dumps(header, separators=(",", ":")).encode("utf-8"))
+    flat = [value for position in positions for value in position]
+    with open(path, "wb") as templateFile:
+        templateFile.write(MAGIC)
+        templateFile.write(struct.pack("<I", len(compressed)))
+        templateFile.write(compressed)
+        templateFile.write(struct.pack("<" + str(len(flat)) + "f", *flat))
+
+
+def readTemplate(path):
+    if path.endswith(".json"):
+        with open(path) as templateFile:
+            return json.load(templateFile)
+
+    with open(path, "rb") as templateFile:
+        data = templateFile.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(path + " is not a rig template")
+
+    start = len(MAGIC) + 4
+    length = struct.unpack("<I", data[len(MAGIC):start])[0]
+    template = json.loads(zlib.decompress(data[start:start + length]).decode("utf-8"))
+    flat = struct.unpack("<" + str((len(data) - start - length) // 4) + "f", data[start + length:])
+    template["positions"] = [list(flat[i:i + 3]) for i in range(0, len(flat), 3)]
+    return template
@@ -1,62 +1,344 @@
-import maya.cmds as cmds
-from importlib import reload
-import locators
-import joints
-
-# Reloads all supporting files each time script is run
-# Necessary or you would need to restart Maya after any updates
-locators = reload(locators)
-joints = reload(joints)
-
-
-class RiggingBuddy():
-    def __init__(self):
-        self.buildUI()
-        
-        
-    def buildUI(self):
-        cmds.window("Rigging Buddy 1.0")
-        cmds.rowColumnLayout(numberOfColumns=2)
-        cmds.separator(style="none")
-        
-        cmds.separator(h = 10, st = "none")
-        locators.createFields()
-        cmds.separator(h = 10, st = "none")
-        
-        cmds.separator(h = 10, st = "none")
-        cmds.button(label="Create Locators", width=200, command="locators.createLocators()")
-        cmds.button(label="Mirror L->R", width=200, command="locators.mirrorLocators()") 
-        cmds.separator(h = 10, st = "none")
-        
-        cmds.separator(style="none")
-        cmds.button(label="Create Joints", width=200, command="joints.createJoints()")
-        
-        cmds.separator(height=10, style="none")
-        cmds.button(label="Delete Locators", width=200, command="locators.deleteLocators()")
-        cmds.button(label="Delete Joints", width=200, command="joints.deleteJoints()")
-        cmds.separator(height=10, style="none")
-        
-        cmds.button(label="Delete All", width=200, command=self.deleteAll)
-        
-        cmds.showWindow()
-        
-        
-    def deleteAll(self, void):
-        cmds.delete("opm*")
-        cmds.delete("JNT_*")
-        
-
-RiggingBuddy()
-
-
-
-
-
-
-
-
-
-
-
-                      
-
+import importlib
+import sys
+import time
+
+# When this module started loading, used by the startup report
+startTime = time.perf_counter()
+
+import maya.cmds as cmds
+import locators
+import undo
+
+# Seconds spent on each part of opening the tool, see printStartupReport
+startupTimes = {"imports": time.perf_counter() - startTime}
+
+# Modules of the tool in the order they depend on each other, used by reloadModules
+# Only locators, with the modules it builds with, and undo are imported with the window. The other modules
+# are imported by the buttons that use them, so opening the window stays quick however many subsystems
+# the tool grows
+TOOL_MODULES = ("config", "profiler", "templates", "layout", "registry", "ownership", "builders", "apiBuilder",
+                "plan", "undo", "locators", "joints", "rigFile", "rigCache", "diagnostics", "evaluation",
+                "deferredBuild", "riggingBuddy")
+
+# File types shown by the template export and import dialogs
+TEMPLATE_FILTER = "Rig Templates (*.rbt *.json)"
+
+# The open RiggingBuddy window, see show
+toolWindow = None
+
+
+class RiggingBuddy():
+    def __init__(self):
+        # The chunked build that is running, see deferredBuild.py
+        self.build = None
+        self.buildUI()
+        
+        
+    def buildUI(self):
+        self.window = cmds.window("Rigging Buddy 1.0")
+        cmds.rowColumnLayout(numberOfColumns=2)
+        cmds.separator(style="none")
+        
+        cmds.separator(h = 10, st = "none")
+        locators.createFields()
+        cmds.separator(h = 10, st = "none")
+        
+        cmds.separator(h = 10, st = "none")
+        cmds.button(label="Create Locators", width=200, command=self.createLocators)
+        cmds.button(label="Mirror L->R", width=200, command=self.mirrorLocators)
+        cmds.button(label="Live Mirror L->R", width=200, command=self.createLiveMirror)
+        cmds.button(label="Bake Live Mirror", width=200, command=self.bakeLiveMirror)
+        
+        # Every button works on the rig of this namespace so several characters can share a scene
+        cmds.text("Namespace", label="Namespace")
+        self.namespaceField = cmds.textField(text="")
+        
+        cmds.text("Build Backend", label="Build Backend")
+        self.backendMenu = cmds.optionMenu()
+        cmds.menuItem(label="cmds")
+        cmds.menuItem(label="api")
+        
+        # The lean network gives the same pose with a multMatrix only on the first spine joint
+        cmds.separator(height=10, style="none")
+        self.leanCheckBox = cmds.checkBox(label="Lean Network", value=False)
+        cmds.button(label="Create Joints", width=200, command=self.createJoints)
+        cmds.button(label="Update Rig", width=200, command=self.updateRig)
+        
+        # Chunked builds keep the UI responsive and can be cancelled, they are not recorded for undo
+        # so they are off by default and the build buttons stay single undo chunks
+        cmds.separator(height=10, style="none")
+        self.chunkCheckBox = cmds.checkBox(label="Build In Chunks", value=False)
+        self.progressText = cmds.text(label="")
+        self.progressBar = cmds.progressBar(width=200)
+        cmds.separator(height=10, style="none")
+        cmds.button(label="Cancel Build", width=200, command=self.cancelBuild)
+        
+        cmds.button(label="Delete Locators", width=200, command=self.deleteLocators)
+        cmds.button(label="Delete Joints", width=200, command=self.deleteJoints)
+        cmds.separator(height=10, style="none")
+        
+        cmds.button(label="Delete All", width=200, command=self.deleteAll)
+        
+        cmds.button(label="Export Template", width=200, command=self.exportTemplate)
+        cmds.button(label="Import Template", width=200, command=self.importTemplate)
+        
+        # Configs that were built before are imported from the build cache instead of being built again
+        cmds.button(label="Build Cached Rig", width=200, command=self.buildCachedRig)
+        cmds.button(label="Clear Build Cache", width=200, command=self.clearCache)
+        
+        cmds.button(label="Scene Report", width=200, command=self.sceneReport)
+        cmds.button(label="Clean Up Orphans", width=200, command=self.cleanup)
+        
+        cmds.button(label="Check Evaluation", width=200, command=self.checkEvaluation)
+        cmds.button(label="Profile Playback", width=200, command=self.profilePlayback)
+        
+        # Unchecking this skips the undo queue entirely, which makes big builds faster
+        cmds.separator(height=10, style="none")
+        self.undoCheckBox = cmds.checkBox(label="Record Undo", value=True)
+        
+        # Developer tools: picks up edits to the modules without restarting Maya
+        cmds.button(label="Reload Modules", width=200, command=self.reloadModules)
+        cmds.button(label="Startup Report", width=200, command=self.startupReport)
+        
+        cmds.showWindow()
+        
+        
+    # Every button runs as a single undo chunk, or with the undo queue off if Record Undo is unchecked
+    def undoChunk(self, name):
+        return undo.undoChunk(name, enabled=cmds.checkBox(self.undoCheckBox, query=True, value=True))
+        
+        
+    # Builds run as one undo chunk too, except with the api backend. It commits its nodes with an
+    # MDagModifier that the undo queue never sees, so undoing the chunk would only remove the groups and
+    # leave the joints and matrix nodes behind. Those builds run with the undo queue off instead
+    def buildUndoChunk(self, name):
+        if self.backend() == "api":
+            print("Builds with the api backend are not recorded for undo, use the delete buttons instead")
+            return undo.undoChunk(name, enabled=False)
+        return self.undoChunk(name)
+        
+        
+    def createLocators(self, void):
+        # The fields are read once here and the config is passed through the build
+        rigConfig = locators.readConfig()
+        if self.chunked():
+            self.startBuild(rigConfig, makeJoints=False)
+            return
+        with self.buildUndoChunk("createLocators"):
+            locators.createLocators(rigConfig, backend=self.backend(), namespace=self.namespace())
+            
+            
+    def mirrorLocators(self, void):
+        with self.undoChunk("mirrorLocators"):
+            locators.mirrorLocators(self.namespace())
+        
+        
+    # Keeps the right locators mirrored while the left ones are moved until the mirror is baked
+    def createLiveMirror(self, void):
+        with self.undoChunk("createLiveMirror"):
+            locators.createLiveMirror(self.namespace())
+        
+        
+    def bakeLiveMirror(self, void):
+        with self.undoChunk("bakeLiveMirror"):
+            locators.bakeLiveMirror(self.namespace())
+        
+        
+    # Backend picked in the option menu, used to build both the locators and the joints
+    def backend(self):
+        return cmds.optionMenu(self.backendMenu, query=True, value=True)
+        
+        
+    # Only the cmds backend is built in chunks. The api backend makes every node with one doIt in its last
+    # step, so chunks would only add a progress bar that does not move before the same freeze
+    def chunked(self):
+        return cmds.checkBox(self.chunkCheckBox, query=True, value=True) and self.backend() == "cmds"
+        
+        
+    def lean(self):
+        return cmds.checkBox(self.leanCheckBox, query=True, value=True)
+        
+        
+    # Namespace typed in the field, "hero" becomes the Maya namespace "hero:" and "hero_" is used as a prefix
+    def namespace(self):
+        namespace = cmds.textField(self.namespaceField, query=True, text=True).strip()
+        if namespace and not namespace.endswith((":", "_")):
+            namespace += ":"
+        return namespace
+        
+        
+    def createJoints(self, void):
+        # The locators may have been edited or undone by hand since they were registered
+        locators.getRegistry(self.namespace(), refresh=True)
+        if self.chunked():
+            self.startBuild(None, makeLocators=False)
+            return
+        import joints
+        with self.buildUndoChunk("createJoints"):
+            joints.createJoints(backend=self.backend(), namespace=self.namespace(), lean=self.lean())
+            
+            
+    # Starts a chunked build, only one build runs at a time
+    def startBuild(self, rigConfig, makeLocators=True, makeJoints=True):
+        if self.build is not None and self.build.running:
+            print("A build is already running!")
+            return
+        import deferredBuild
+        cmds.progressBar(self.progressBar, edit=True, progress=0)
+        self.build = deferredBuild.buildRig(rigConfig, backend=self.backend(), namespace=self.namespace(),
+                                            lean=self.lean(), makeLocators=makeLocators, makeJoints=makeJoints,
+                                            onProgress=self.showProgress, onDone=self.buildDone)
+            
+            
+    def showProgress(self, done, total, chainName):
+        cmds.progressBar(self.progressBar, edit=True, maxValue=total, progress=done)
+        cmds.text(self.progressText, edit=True, label=str(done) + "/" + str(total) + " " + chainName)
+            
+            
+    def buildDone(self, cancelled):
+        cmds.progressBar(self.progressBar, edit=True, progress=0)
+        cmds.text(self.progressText, edit=True, label="Cancelled" if cancelled else "")
+            
+            
+    # Stops the running build and deletes everything it made
+    def cancelBuild(self, void):
+        if self.build is not None:
+            self.build.cancel()
+            
+            
+    # Brings the locators and joints in line with the fields and only rebuilds the chains that changed
+    def updateRig(self, void):
+        import joints
+        rigConfig = locators.readConfig()
+        locators.getRegistry(self.namespace(), refresh=True)
+        with self.buildUndoChunk("updateRig"):
+            locators.updateLocators(rigConfig, backend=self.backend(), namespace=self.namespace())
+            joints.updateJoints(rigConfig, backend=self.backend(), namespace=self.namespace(), lean=self.lean())
+            
+            
+    def deleteLocators(self, void):
+        with self.undoChunk("deleteLocators"):
+            locators.deleteLocators(self.namespace())
+            
+            
+    def deleteJoints(self, void):
+        import joints
+        with self.undoChunk("deleteJoints"):
+            joints.deleteJoints(self.namespace())
+        
+        
+    # Saves the locators as a rig template, .json or the compact binary .rbt format
+    def exportTemplate(self, void):
+        paths = cmds.fileDialog2(fileFilter=TEMPLATE_FILTER, fileMode=0, caption="Export Template")
+        if paths:
+            import rigFile
+            rigFile.exportRig(paths[0], locators.readConfig(), self.namespace())
+            
+            
+    # Loads the locators of a rig template together with the joints saved in it
+    def importTemplate(self, void):
+        paths = cmds.fileDialog2(fileFilter=TEMPLATE_FILTER, fileMode=1, caption="Import Template")
+        if paths:
+            import rigFile
+            with self.buildUndoChunk("importTemplate"):
+                rigFile.importRig(paths[0], backend=self.backend(), buildJoints=True, namespace=self.namespace())
+            
+            
+    def buildCachedRig(self, void):
+        import rigCache
+        rigConfig = locators.readConfig()
+        with self.buildUndoChunk("buildCachedRig"):
+            rigCache.buildRig(rigConfig, backend=self.backend(), namespace=self.namespace(), lean=self.lean())
+            
+            
+    def clearCache(self, void):
+        import rigCache
+        print("Deleted " + str(rigCache.clearCache()) + " cached rigs")
+            
+            
+    # Prints the RiggingBuddy nodes in the scene by type: owned by a rig, untracked and orphaned
+    def sceneReport(self, void):
+        import diagnostics
+        diagnostics.printReport(diagnostics.sceneReport())
+            
+            
+    def cleanup(self, void):
+        import diagnostics
+        with self.undoChunk("cleanup"):
+            print("Deleted " + str(diagnostics.cleanup()) + " orphaned nodes")
+            
+            
+    # Prints the cycles, parallelism and most expensive nodes of the evaluation graph of the rig
+    def checkEvaluation(self, void):
+        import evaluation
+        evaluation.printReport(evaluation.analyzeGraph(evaluation.rigGraph(self.namespace())))
+            
+            
+    # Plays back the rig under DG and parallel evaluation
+    def profilePlayback(self, void):
+        import evaluation
+        rates = evaluation.profilePlayback(namespace=self.namespace())
+        for mode, rate in rates.items():
+            print(("DG" if mode == "off" else mode).ljust(10) + str(round(rate, 1)).rjust(8) + " fps")
+            
+            
+    # Only deletes the rig of the namespace, other characters in the scene are left alone
+    def deleteAll(self, void):
+        import joints
+        namespace = self.namespace()
+        with self.undoChunk("deleteAll"):
+            if cmds.objExists(namespace + "opmStorage_GRP"):
+                locators.deleteLocators(namespace)
+            if cmds.objExists(namespace + "JNT_GRP"):
+                joints.deleteJoints(namespace)
+            
+            
+    def reloadModules(self, void):
+        reloadModules()
+            
+            
+    def startupReport(self, void):
+        printStartupReport()
+
+
+# Opens the window, or brings it to the front when it is already open
+# Shelf button command: import riggingBuddy; riggingBuddy.show()
+def show():
+    global toolWindow
+    if toolWindow is not None and cmds.window(toolWindow.window, exists=True):
+        cmds.showWindow(toolWindow.window)
+        return toolWindow
+
+    start = time.perf_counter()
+    toolWindow = RiggingBuddy()
+    startupTimes["window"] = time.perf_counter() - start
+    return toolWindow
+
+
+# Developer action: reloads the modules of the tool that are imported so edits to them are picked up
+# without restarting Maya, then opens the window again. Modules that were never imported are left alone,
+# they are loaded fresh the first time a button needs them
+def reloadModules():
+    if toolWindow is not None and cmds.window(toolWindow.window, exists=True):
+        cmds.deleteUI(toolWindow.window)
+    for name in TOOL_MODULES:
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+    # Reloading this module opens the window again, unless it was run as a script instead of imported
+    show()
+
+
+def printStartupReport():
+    total = 0.0
+    for part in ("imports", "window"):
+        if part in startupTimes:
+            total += startupTimes[part]
+            print(part.ljust(10) + str(round(startupTimes[part] * 1000, 2)).rjust(10) + " ms")
+    print("total".ljust(10) + str(round(total * 1000, 2)).rjust(10) + " ms")
+    print("Imported: " + ", ".join(name for name in TOOL_MODULES if name in sys.modules))
+    print("Not imported yet: " + ", ".join(name for name in TOOL_MODULES + ("numpy",) if name not in sys.modules))
+
+
+# The window is only built in an interactive session so the modules can be used from mayapy
+if not cmds.about(batch=True):
+    show()
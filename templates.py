@@ -0,0 +1,165 @@
+# Data driven description of the skeleton built by locators.py and joints.py
+#
+# Every limb is one entry in SKELETON. Both the locators and the joints are built
+# by walking the expanded chains, so adding a tail, extra limbs or more fingers
+# only needs a new entry here and no new build code.
+#
+# Keys of a chain entry:
+#   name        - chain name used in LOC_/JNT_ names (LOC_<side>_<name>_<index>)
+#   side        - None for the root/spine, "C" for centre chains, "L" for sided chains
+#   mirror      - True creates an "R" copy of an "L" chain flipped in X
+#   parent      - (chain name, segment index) the first joint is parented to, -1 is the last segment
+#   offsets     - default position of each segment relative to the parent segment
+#   worldSpace  - True if the offsets are world positions instead of parent relative
+#   count       - RigConfig count that sets the amount of segments (offsets[0] + step * i)
+#   step        - offset added for every segment of a counted chain
+#   repeat      - RigConfig count that sets how many copies of this chain are made
+#   repeatStep  - offset added to each repeated copy
+#   scale       - size of the locators
+#   aimParent   - True if the parent segment aims at the first segment of this chain
+#   parentSpace - matrix of the parent _REST node used to find the local offset of the first joint
+SKELETON = [
+    {"name": "root", "side": None, "parent": None, "offsets": [(0, 2.5, 0)], "worldSpace": True,
+     "scale": 0.15},
+    {"name": "spine", "side": None, "parent": ("root", 0), "offsets": [(0, 0.25, 0)], "step": (0, 0.25, 0),
+     "count": "spineCount", "aimParent": True, "parentSpace": "worldInverseMatrix"},
+    {"name": "head", "side": "C", "parent": ("spine", -1), "offsets": [(0, 0.25, 0), (0, 0.7, 0), (0, 1.0, 0)],
+     "aimParent": True},
+    {"name": "jaw", "side": "C", "parent": ("head", 1), "offsets": [(0, -0.2, 0.05), (0, -0.3, 0.2)]},
+    {"name": "eye", "side": "L", "mirror": True, "parent": ("head", 1), "offsets": [(0.1, 0, 0.15), (0.1, 0, 0.3)]},
+    {"name": "leg", "side": "L", "mirror": True, "parent": ("root", 0), "worldSpace": True,
+     "offsets": [(0.2, 2.4, 0), (0.33, 1.3, 0), (0.4, 0.2, 0), (0.4, 0, 0.2), (0.4, 0, 0.5)]},
+    {"name": "arm", "side": "L", "mirror": True, "parent": ("spine", -1),
+     "offsets": [(0.25, 0.25, 0), (0.5, 0.05, 0), (0.9, -0.3, 0), (1.4, -0.65, 0)]},
+    {"name": "finger", "side": "L", "mirror": True, "parent": ("arm", 3), "repeat": "fingerCount",
+     "offsets": [(0.1, -0.1, 0), (0.2, -0.2, 0), (0.3, -0.3, 0), (0.4, -0.4, 0)], "repeatStep": (0, 0, -0.05),
+     "scale": 0.03},
+]
+
+
+# One expanded chain of the skeleton. Names are built here so every module agrees on them.
+class Chain():
+    def __init__(self, entry, side, key, positions):
+        self.name = entry["name"]
+        self.side = side
+        self.key = key
+        self.positions = positions
+        self.scale = entry.get("scale", 0.1)
+        self.aimParent = entry.get("aimParent", False)
+        self.parentSpace = entry.get("parentSpace", "parentInverseMatrix")
+        # Prepended to every node name, a Maya namespace such as "hero:" or a prefix such as "hero_"
+        self.namespace = ""
+        self.parent = None
+        self.parentIndex = None
+        # Left side offsets before scale and proportions, world positions if worldSpace is True
+        self.offsets = []
+        self.worldSpace = False
+        # Segment that each segment aims at as (chain, index), None if it is not aimed
+        self.aims = [None] * len(positions)
+
+
+    def __len__(self):
+        return len(self.positions)
+
+
+    # Example: spine_2, L_finger_3_1 or root for single segment chains without a side
+    def segmentName(self, index):
+        if self.key == "root":
+            return self.key
+        return self.key + "_" + str(index)
+
+
+    def locatorName(self, index):
+        return self.namespace + "LOC_" + self.segmentName(index)
+
+
+    def jointName(self, index):
+        return self.namespace + "JNT_" + self.segmentName(index)
+
+
+# Expands the template into concrete chains using the counts, scale and proportions of a RigConfig
+# Chains are returned in build order so a parent chain always comes before its children
+# namespace is prepended to the names of every chain
+def expandSkeleton(config, skeleton=SKELETON, namespace=""):
+    chains = []
+    byName = {}
+
+    for entry in skeleton:
+        copies = range(config.count(entry["repeat"])) if "repeat" in entry else [None]
+        sides = [entry["side"], "R"] if entry.get("mirror") else [entry["side"]]
+
+        for side in sides:
+            for copy in copies:
+                key = entry["name"] if side is None else side + "_" + entry["name"]
+                if copy is not None:
+                    key += "_" + str(copy)
+
+                # Finds the parent chain on the same side, falling back to the centre chains
+                parent = None
+                parentIndex = None
+                if entry["parent"]:
+                    parentName, parentIndex = entry["parent"]
+                    parent = byName.get((parentName, side)) or byName.get((parentName, "C")) \
+                        or byName.get((parentName, None))
+                    if parent is None:
+                        raise ValueError("Chain " + key + " has no parent chain " + parentName)
+                    if parentIndex < 0:
+                        parentIndex += len(parent)
+
+                offsets = _segmentOffsets(entry, config, copy)
+                positions = _segmentPositions(entry, config, offsets, parent, parentIndex)
+                if side == "R":
+                    positions = [(-p[0], p[1], p[2]) for p in positions]
+
+                chain = Chain(entry, side, key, positions)
+                chain.scale *= config.scale
+                chain.parent = parent
+                chain.parentIndex = parentIndex
+                chain.namespace = namespace
+                chain.offsets = offsets
+                chain.worldSpace = bool(entry.get("worldSpace")) or parent is None
+                chains.append(chain)
+                byName.setdefault((entry["name"], side), chain)
+
+    # Each segment aims at the next one in its chain. The last segment of a chain
+    # only aims at a child chain that continues it (spine -> head)
+    for chain in chains:
+        for i in range(len(chain) - 1):
+            chain.aims[i] = (chain, i + 1)
+        if chain.aimParent and chain.parent is not None:
+            if chain.parent.aims[chain.parentIndex] is not None:
+                raise ValueError("Segment " + chain.parent.segmentName(chain.parentIndex) + " is already aimed")
+            chain.parent.aims[chain.parentIndex] = (chain, 0)
+
+    return chains
+
+
+# Offsets of every segment of a template entry with the count and repeat steps applied
+def _segmentOffsets(entry, config, copy):
+    if "count" in entry:
+        first = entry["offsets"][0]
+        step = entry["step"]
+        offsets = [tuple(first[a] + step[a] * i for a in range(3)) for i in range(config.count(entry["count"]))]
+    else:
+        offsets = list(entry["offsets"])
+
+    if copy is not None:
+        step = entry.get("repeatStep", (0, 0, 0))
+        offsets = [tuple(o[a] + step[a] * copy for a in range(3)) for o in offsets]
+    return offsets
+
+
+# Default world positions of the segments of a template entry for the left/centre side
+# Proportions only stretch parent relative offsets, world space chains just follow the scale
+def _segmentPositions(entry, config, offsets, parent, parentIndex):
+    if entry.get("worldSpace") or parent is None:
+        return [tuple(o[a] * config.scale for a in range(3)) for o in offsets]
+
+    multiplier = config.scale * config.proportion(entry["name"])
+    offsets = [tuple(o[a] * multiplier for a in range(3)) for o in offsets]
+
+    # Parent positions are already flipped for the right side so the left side copy is used
+    origin = parent.positions[parentIndex]
+    if parent.side == "R":
+        origin = (-origin[0], origin[1], origin[2])
+    return [tuple(origin[a] + o[a] for a in range(3)) for o in offsets]
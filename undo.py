@@ -0,0 +1,55 @@
+import time
+from contextlib import contextmanager
+import maya.cmds as cmds
+
+
+# Runs everything inside the with block as one undo chunk so a whole build is undone in one step
+# With enabled=False the undo queue is suspended instead, which is faster for batch/headless runs
+# Example:
+#     with undo.undoChunk("createLocators"):
+#         locators.createLocators()
+@contextmanager
+def undoChunk(name="riggingBuddy", enabled=True):
+    if not enabled:
+        # stateWithoutFlush keeps the existing undo history intact while recording is off
+        state = cmds.undoInfo(query=True, state=True)
+        cmds.undoInfo(stateWithoutFlush=False)
+        try:
+            yield
+        finally:
+            cmds.undoInfo(stateWithoutFlush=state)
+        return
+
+    cmds.undoInfo(openChunk=True, chunkName=name)
+    try:
+        yield
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+
+# Times a build with every command on the undo queue, with one undo chunk and with undo disabled
+# build and cleanup are functions, cleanup runs outside of the timing after every build
+# Returns the average seconds for each mode. Example:
+#     undo.measureUndo(lambda: (locators.createLocators(), joints.createJoints()),
+#                      lambda: (locators.deleteLocators(), joints.deleteJoints()))
+def measureUndo(build, cleanup, repeats=3):
+    results = {}
+    for mode in ("queue", "chunk", "off"):
+        total = 0.0
+        for i in range(repeats):
+            start = time.perf_counter()
+            if mode == "queue":
+                build()
+            else:
+                with undoChunk("measureUndo", enabled=(mode == "chunk")):
+                    build()
+            total += time.perf_counter() - start
+
+            cleanup()
+            # Clears the history of this run so every repeat starts from the same queue size
+            cmds.flushUndo()
+        results[mode] = total / repeats
+
+    for mode, seconds in results.items():
+        print("Undo " + mode + ": " + str(round(seconds * 1000, 2)) + " ms")
+    return results